@@ -1,32 +1,61 @@
 import os
+from time import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-from celery import Celery
+import redis
+from celery import Celery, chord, group
 from dotenv import load_dotenv
 from flask import Flask, request
 from flask_migrate import Migrate
-from sqlalchemy.inspection import inspect
+from sqlalchemy import literal_column, select
+from sqlalchemy.dialects.postgresql import insert
 
 import models
 from models import db
-from linkedin import LinkedInExtented
+from bulk_load import COPY_THRESHOLD, copy_upsert, hash_rows, touch_rows
+from sessions import session_pool
+from credentials import CredentialScheduler, load_li_creds
+from company_cache import CompanyCache
+from progress import JobProgress
+from profile_cache import ProfileCache
+from single_flight import SingleFlight
+from linkedin import dedupe_company_entries
+from read_api import read_api
+from write_behind import WriteBehind
+from lifecycle import worker_lifecycle
+from response_cache import response_cache
 
 
 load_dotenv()
 
 
-li_array_len, li_creds, os.environ['LI_CURRENT_IDX'] = int(os.getenv("LI_ARRAY_LEN", 0)), [], "0"
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", 1000))
+
+# companies per `scrape_batch` task and how many of them are resolved at once
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", 100))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 8))
+
+REDIS_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379")
+
+
+redis_client = redis.Redis.from_url(REDIS_URL)
+
+credential_scheduler = CredentialScheduler(REDIS_URL, load_li_creds())
+
+company_cache = CompanyCache(REDIS_URL)
+
+profile_cache = ProfileCache(REDIS_URL)
+
+single_flight = SingleFlight(REDIS_URL)
+
+
+class LoginError(Exception):
+    pass
 
-if li_array_len:
-    for i in range(0, li_array_len):
-        li_temp_email, li_temp_pass = os.getenv(f"LI_EMAIL_{i}"), os.getenv(f"LI_PASS_{i}")
-        if li_temp_email and li_temp_pass:
-            li_creds.append({"username": li_temp_email, "password": li_temp_pass})
-else:
-    li_creds.append({"username": os.getenv("LI_EMAIL"), "password": os.getenv("LI_PASS")})
 
 def get_li_creds():
-    os.environ['LI_CURRENT_IDX'] = str((int(os.environ['LI_CURRENT_IDX']) + 1) % max(li_array_len , 1))
-    return li_creds[int(os.environ['LI_CURRENT_IDX'])]
+    return {**credential_scheduler.next(), "scheduler": credential_scheduler}
 
 
 app = Flask("linkedin_company_scrapper")
@@ -39,8 +68,15 @@ with app.app_context():
         ),
         CELERY_BROKER_URL=os.getenv("CELERY_BROKER_URL", "redis://localhost:6379"),
         CELERY_RESULT_BACKEND=os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379"),
+        SQLALCHEMY_ENGINE_OPTIONS={
+            "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+            "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 30 * 60)),
+            "pool_pre_ping": True,
+        },
     )
     db.init_app(app)
+    response_cache.init_app(app, REDIS_URL)
     migrate = Migrate(app, db)
 
     celery = Celery(
@@ -51,12 +87,18 @@ with app.app_context():
 
     celery.conf.update(app.config)
 
+    worker_lifecycle.init_app(app, db, celery)
+    worker_lifecycle.on_shutdown(session_pool.aclose)
+
+app.register_blueprint(read_api)
+
 @app.route("/")
 def hello_world():
     return "Hello World"
 
 
 @app.route("/schema")
+@response_cache.cached()
 def schema():
     return {
         "company_name": "<str: company_name>",
@@ -65,92 +107,484 @@ def schema():
         "posts": "<bool: get_company_posts? | default: False>",
         "employees": "<bool: get_employees? | default: False>",
         "events": "<bool: get_company_events? | default: False>",
+        "force_refresh": "<bool: skip company cache and recently scraped sections? | default: False>",
+        "companies": "<list[str]: company names or links, /scrape/batch only>",
     }
 
 
-def bulk_upsert(raw_data: list, model_cls: db.Model):
-    primary_key = inspect(model_cls).primary_key[0].name
-    columns = [column.name for column in inspect(model_cls).c]
-    model_ints = {
-        str(data[primary_key]): model_cls(**{c: data.get(c) for c in columns}) for data in raw_data
+@app.route("/sessions")
+def sessions():
+    return session_pool.stats()
+
+
+@app.route("/stats")
+def stats():
+    return {
+        "sessions": session_pool.stats(),
+        "accounts": credential_scheduler.stats(),
+        "profiles": profile_cache.stats(),
     }
 
-    query_for_existing_rows = model_cls.query.filter(
-        getattr(model_cls, primary_key).in_(model_ints.keys())
-    ).all()
 
-    # update previous records
-    for instance in query_for_existing_rows:
-        db.session.merge(model_ints.pop(str(getattr(instance, primary_key))))
+def bulk_upsert(raw_data: list, model_cls: db.Model, batch_size=UPSERT_BATCH_SIZE):
+    """
+    Upsert `raw_data` into the table of `model_cls` (a model or a `db.Table`)
+    with one `INSERT ... ON CONFLICT` statement per `batch_size` rows.
+
+    Returns a dict of primary key to whether that row was newly inserted,
+    rows whose `content_hash` did not change are not returned and only have
+    their `scraped_at` refreshed.
+    """
+
+    table = getattr(model_cls, '__table__', model_cls)
+    columns = [column.name for column in table.columns]
+    primary_keys = [column.name for column in table.primary_key.columns]
+    key_columns = primary_keys or columns
+
+    def key_of(data):
+        key = tuple(str(data.get(c)) for c in key_columns)
+        return key[0] if len(key) == 1 else key
+
+    # same key twice in one statement makes `ON CONFLICT DO UPDATE` fail
+    rows = hash_rows(list({
+        key_of(data): {c: data.get(c) for c in columns} for data in raw_data
+    }.values()), table)
+
+    affected = {}
+
+    for i in range(0, len(rows), batch_size):
+        stmt = insert(table).values(rows[i:i + batch_size])
+        update_columns = {c: stmt.excluded[c] for c in columns if c not in primary_keys}
+
+        if primary_keys and update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=primary_keys, set_=update_columns,
+                where=table.c.content_hash.is_distinct_from(
+                    stmt.excluded.content_hash
+                ) if 'content_hash' in table.c else None
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing()
+
+        stmt = stmt.returning(
+            *[table.c[c] for c in key_columns], literal_column("xmax = 0").label("inserted")
+        )
+
+        for row in db.session.execute(stmt):
+            affected[key_of(row._mapping)] = row.inserted
 
-    # create new records
-    db.session.add_all(model_ints.values())
+    touch_rows(table, [row for row in rows if key_of(row) not in affected])
 
     db.session.commit()
 
-    return model_ints
+    if affected:
+        invalidate_responses(table, [row for row in rows if key_of(row) in affected])
 
+    return affected
 
-@celery.task(autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 300})
-def scrape_and_save(company_details, jobs=False, posts=False, employees=False, events=False):
-    linked_in = LinkedInExtented(**get_li_creds())
 
-    app.app_context().push()
+def invalidate_responses(table, rows):
+    """
+    Retire the cached read responses of every company `rows` of `table` belong to.
+    """
 
-    if jobs:
-        jobs_details = linked_in.loop.run_until_complete(
-            linked_in.get_jobs(company_details)
-        )
-        if jobs_details:
-            try:
-                bulk_upsert(jobs_details, models.JobDetails)
-            except:
-                db.session.rollback()
+    if table is models.CompanyBaseDetails.__table__:
+        response_cache.invalidate([row['internal_id'] for row in rows], listing=True)
+    elif table is models.EmployeeDetails.__table__:
+        record = models.employment_record
+        response_cache.invalidate(db.session.execute(
+            select(record.c.company_id).distinct().where(
+                record.c.employee_id.in_([row['public_id'] for row in rows])
+            )
+        ).scalars())
+    elif 'company_id' in table.c and table is not models.ScrapeState.__table__:
+        response_cache.invalidate([row['company_id'] for row in rows])
 
-    if posts:
-        post_details = linked_in.loop.run_until_complete(
-            linked_in.get_company_posts(company_details)
-        )
-        if post_details:
-            try:
-                bulk_upsert(post_details, models.PostDetails)
-            except:
-                db.session.rollback()
 
-    if events:
-        event_details = linked_in.loop.run_until_complete(
-            linked_in.get_company_events(company_details)
-        )
-        if any(event_details.values()):
-            try:
-                bulk_upsert(
-                    event_details['UPCOMING'] + event_details['TODAY']
-                    + event_details['PAST'], models.EventDetails
-                )
-            except:
-                db.session.rollback()
+def link_employees(company_id, public_ids, batch_size=UPSERT_BATCH_SIZE):
+    """
+    Insert `(company_id, employee_id)` pairs into `linkedin_employment_records`,
+    pairs that already exist are skipped by its unique constraint.
+    """
+
+    table = models.employment_record
+    public_ids = list(dict.fromkeys(public_ids))
 
-    if employees:
+    linked = 0
+    for i in range(0, len(public_ids), batch_size):
+        linked += db.session.execute(
+            insert(table).values([
+                {"company_id": company_id, "employee_id": public_id}
+                for public_id in public_ids[i:i + batch_size]
+            ]).on_conflict_do_nothing(index_elements=[table.c.company_id, table.c.employee_id])
+        ).rowcount
+
+    db.session.commit()
+
+    if linked:
+        response_cache.invalidate([company_id])
+
+
+SECTIONS = ("jobs", "posts", "events", "employees")
+
+# every section has a queue of its own, employee chunks too, so workers scale per section
+SECTION_QUEUES = {section: os.getenv(f"{section.upper()}_QUEUE", section) for section in SECTIONS}
+EMPLOYEE_CHUNKS_QUEUE = os.getenv("EMPLOYEE_CHUNKS_QUEUE", "employee_chunks")
+
+SECTION_RETRY_OPTIONS = {
+    "autoretry_for": (Exception,),
+    "retry_backoff": int(os.getenv("SECTION_RETRY_BACKOFF", 5)),
+    "retry_jitter": True,
+    "retry_kwargs": {"max_retries": int(os.getenv("SECTION_MAX_RETRIES", 3))},
+}
+
+
+def save_links(company_id, public_ids):
+    try:
+        link_employees(company_id, public_ids)
+    except Exception:
+        db.session.rollback()
+        raise
 
-        func_list = linked_in.loop.run_until_complete(
-            linked_in.get_employees_functions(company_details)
+
+def save_rows(rows, model_cls):
+    try:
+        if len(rows) >= COPY_THRESHOLD:
+            affected = copy_upsert(rows, model_cls)
+            if affected:
+                invalidate_responses(getattr(model_cls, '__table__', model_cls), rows)
+            return affected
+        return bulk_upsert(rows, model_cls)
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def get_scrape_state(company_details, section):
+    state = models.ScrapeState.query.get((company_details['internal_id'], section))
+    return {
+        "company_id": company_details['internal_id'], "section": section,
+        "last_run_at": None, "newest_listed_at": None, "newest_link": None,
+        **({
+            c: str(getattr(state, c)) if getattr(state, c) is not None else None
+            for c in ("last_run_at", "newest_listed_at", "newest_link")
+        } if state else {})
+    }
+
+
+def save_scrape_state(state, **fields):
+    bulk_upsert([{**state, "last_run_at": str(datetime.utcnow()), **fields}], models.ScrapeState)
+
+
+def persist_rows(section, model_cls, progress):
+    """
+    `flush` of a `WriteBehind` for rows of `model_cls`, run in an executor thread.
+    """
+
+    def flush(rows):
+        with app.app_context():
+            progress.add(section, persisted=len(save_rows(rows, model_cls)))
+    return flush
+
+
+def persist_employees(company_details, progress):
+    def flush(employee_details):
+        with app.app_context():
+            save_employees(company_details, employee_details, progress)
+    return flush
+
+
+async def scrape_jobs(linked_in, company_details, progress):
+    state = get_scrape_state(company_details, "jobs")
+    since = state["newest_listed_at"]
+    newest_listed_at = since or ""
+
+    async with WriteBehind(persist_rows("jobs", models.JobDetails, progress)) as writer:
+        async for job in linked_in.iter_jobs(
+            company_details, since=datetime.fromisoformat(since) if since else None
+        ):
+            newest_listed_at = max(newest_listed_at, job['listed_at'])
+            progress.add("jobs", fetched=1)
+            await writer.put(job)
+
+    save_scrape_state(state, newest_listed_at=newest_listed_at or None)
+
+
+async def scrape_posts(linked_in, company_details, progress):
+    state = get_scrape_state(company_details, "posts")
+
+    newest_link = None
+
+    async with WriteBehind(persist_rows("posts", models.PostDetails, progress)) as writer:
+        async for post in linked_in.iter_company_posts(company_details, until_link=state["newest_link"]):
+            # posts come newest first
+            newest_link = newest_link or post['link']
+            progress.add("posts", fetched=1)
+            await writer.put(post)
+
+    save_scrape_state(state, newest_link=newest_link or state["newest_link"])
+
+
+async def scrape_events(linked_in, company_details, progress):
+    async with WriteBehind(persist_rows("events", models.EventDetails, progress)) as writer:
+        async for event in linked_in.stream_company_events(company_details):
+            progress.add("events", fetched=1)
+            # `event_id` is the primary key, an event with neither vanity name nor urn can't be kept
+            if event['event_id'] is not None:
+                await writer.put(event)
+
+    save_scrape_state(get_scrape_state(company_details, "events"))
+
+
+def save_employees(company_details, employee_details, progress):
+    employee_keys = save_rows(employee_details, models.EmployeeDetails)
+    progress.add("employees", persisted=len(employee_keys))
+    save_links(company_details['internal_id'], [i['public_id'] for i in employee_details])
+    # only once linked, a retry skips the profiles marked
+    profile_cache.mark([i['public_id'] for i in employee_details])
+
+
+# employees are scraped by `discover_employees` and `scrape_employee_chunk`
+SECTION_SCRAPERS = {
+    "jobs": scrape_jobs,
+    "posts": scrape_posts,
+    "events": scrape_events,
+}
+
+async def scrape_section(section, linked_in, company_details, progress):
+    progress.start(section)
+    # requests in flight are capped per account, by the limiter of `linked_in`
+    await SECTION_SCRAPERS[section](linked_in, company_details, progress)
+    progress.finish(section)
+
+
+def resolve_company(company_name=None, company_link=None, force_refresh=False):
+    """
+    Resolve a company through `company_cache`, saving it when it came from Voyager.
+    """
+
+    def fetch_company(slug):
+        try:
+            linked_in = session_pool.get(**get_li_creds())
+        except Exception as e:
+            raise LoginError() from e
+
+        return linked_in.get_company(
+            company_username=company_name,
+            company_link=company_link
         )
 
-        company_instance = db.session.query(
-            models.CompanyBaseDetails
-        ).get(company_details['internal_id']) if func_list else None
+    company_details, source = company_cache.resolve(
+        fetch_company, company_name, company_link, force_refresh=force_refresh
+    )
 
-        for func in func_list:
-            employee_details = linked_in.loop.run_until_complete(func())
+    if not company_details:
+        raise ValueError("Invalid Company Name or Link")
 
-            if employee_details:
-                try:
-                    employee_ints = bulk_upsert(employee_details, models.EmployeeDetails)
+    if source == "voyager":
+        bulk_upsert([company_details], models.CompanyBaseDetails)
+
+    return company_details
+
+
+class SectionTask(celery.Task):
+    """
+    Base of the tasks a section is split into, reports their retries and
+    final failure to the progress of the job (`job_id` keyword argument).
+    A failed `chunk` is left to the error callback of its chord instead.
+    """
+
+    section = None
+    chunk = False
+
+    def progress(self, kwargs):
+        return JobProgress(redis_client, kwargs["job_id"]), kwargs.get("section", self.section)
+
+    def on_retry(self, exc, task_id, args, kwargs, einfo):
+        progress, section = self.progress(kwargs)
+        progress.update(**{f"{section}.status": "retrying", f"{section}.error": repr(exc)})
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        if self.chunk:
+            return
+
+        progress, section = self.progress(kwargs)
+        single_flight.release(args[0]['internal_id'], section, progress.job_id, done=False)
+        progress.finish(section, error=exc)
+        progress.settle()
+
+
+@celery.task
+def scrape_and_save(
+    company_details, jobs=False, posts=False, employees=False, events=False, job_id=None,
+    force_refresh=False
+):
+    """
+    Fan a company out into a task per section, on the queue of that section.
+    Each of them retries on its own, employees are split further into chunks.
+    Sections another job is scraping, or has just scraped, are attached to it.
+    """
+
+    enabled = {"jobs": jobs, "posts": posts, "events": events, "employees": employees}
+    sections = [section for section in SECTIONS if enabled[section]]
+
+    progress = JobProgress(redis_client, job_id) if job_id else JobProgress.create(
+        redis_client, sections, company=company_details['universal_name']
+    )
+    progress.update(status="running")
+
+    attached = single_flight.claim(
+        company_details['internal_id'], sections, progress.job_id, force_refresh
+    )
+    for section, other_job_id in attached.items():
+        progress.attach(section, other_job_id)
+    sections = [section for section in sections if section not in attached]
+
+    if not sections:
+        progress.settle()
+        return
+
+    group(
+        (
+            discover_employees.s(company_details, job_id=progress.job_id) if section == "employees"
+            else scrape_section_task.s(company_details, section=section, job_id=progress.job_id)
+        ).set(queue=SECTION_QUEUES[section])
+        for section in sections
+    ).apply_async()
+
+
+@celery.task(bind=True, base=SectionTask, **SECTION_RETRY_OPTIONS)
+def scrape_section_task(self, company_details, section, job_id):
+    linked_in = session_pool.get(**get_li_creds())
+    progress = JobProgress(redis_client, job_id)
+
+    async def scrape():
+        async with single_flight.kept(company_details['internal_id'], section, job_id):
+            await scrape_section(section, linked_in, company_details, progress)
+
+    linked_in.loop.run_until_complete(scrape())
+    single_flight.release(company_details['internal_id'], section, job_id)
+    progress.settle()
+
+
+@celery.task(bind=True, base=SectionTask, section="employees", **SECTION_RETRY_OPTIONS)
+def discover_employees(self, company_details, job_id):
+    """
+    Search the employees of a company and scrape their profiles as a chord
+    of `scrape_employee_chunk`, closed by `finish_employees`.
+    """
+
+    linked_in = session_pool.get(**get_li_creds())
+
+    progress = JobProgress(redis_client, job_id)
+    progress.start("employees")
+
+    async def search():
+        async with single_flight.kept(company_details['internal_id'], "employees", job_id):
+            return await linked_in.search_employee_ids(company_details)
+
+    public_ids = linked_in.loop.run_until_complete(search())
+
+    # profiles scraped recently, e.g. through another company, are only linked
+    cached = profile_cache.fresh(public_ids)
+    if cached:
+        save_links(company_details['internal_id'], cached)
+        progress.add("employees", cached=len(cached))
+
+    public_ids = [i for i in public_ids if i not in cached]
+    chunk_size = linked_in.employee_chunk_size
+
+    if not public_ids:
+        finish_employees(company_details, job_id=job_id)
+        return
+
+    chord(
+        scrape_employee_chunk.s(
+            company_details, public_ids[i:i + chunk_size], job_id=job_id
+        ).set(queue=EMPLOYEE_CHUNKS_QUEUE)
+        for i in range(0, len(public_ids), chunk_size)
+    )(
+        finish_employees.si(company_details, job_id=job_id).set(
+            queue=SECTION_QUEUES["employees"]
+        ).on_error(fail_employees.s(company_details, job_id=job_id))
+    )
+
+
+@celery.task(
+    bind=True, base=SectionTask, section="employees", chunk=True, **SECTION_RETRY_OPTIONS
+)
+def scrape_employee_chunk(self, company_details, public_ids, job_id):
+    linked_in = session_pool.get(**get_li_creds())
 
-                    company_instance.employees.extend(employee_ints.values())
-                    db.session.commit()
-                except:
-                    db.session.rollback()
+    progress = JobProgress(redis_client, job_id)
+
+    # a retry skips the profiles saved by the previous tries, or fresh
+    # through another company meanwhile, linking them is all that is left
+    if self.request.retries:
+        saved = profile_cache.fresh(public_ids)
+        if saved:
+            save_links(company_details['internal_id'], saved)
+        public_ids = [i for i in public_ids if i not in saved]
+
+    async def scrape_chunk():
+        async with single_flight.kept(company_details['internal_id'], "employees", job_id), \
+                WriteBehind(persist_employees(company_details, progress)) as writer:
+            async for employee in linked_in.enrich_employees(public_ids):
+                progress.add("employees", fetched=1)
+                await writer.put(employee)
+
+    linked_in.loop.run_until_complete(scrape_chunk())
+
+
+@celery.task(bind=True, base=SectionTask, section="employees", **SECTION_RETRY_OPTIONS)
+def finish_employees(self, company_details, job_id):
+    save_scrape_state(get_scrape_state(company_details, "employees"))
+    single_flight.release(company_details['internal_id'], "employees", job_id)
+
+    progress = JobProgress(redis_client, job_id)
+    progress.finish("employees")
+    progress.settle()
+
+
+@celery.task
+def fail_employees(request, exc, traceback, company_details, job_id):
+    """
+    Error callback of the chord of `scrape_employee_chunk`, called once
+    every chunk has ended, the lease of the section is only given up then.
+    """
+
+    single_flight.release(company_details['internal_id'], "employees", job_id, done=False)
+
+    progress = JobProgress(redis_client, job_id)
+    progress.finish("employees", error=exc)
+    progress.settle()
+
+
+@celery.task(autoretry_for=(LoginError,), retry_kwargs={'max_retries': 3, 'countdown': 60})
+def resolve_and_scrape(job_id, company_name=None, company_link=None, force_refresh=False, **sections):
+    progress = JobProgress(redis_client, job_id)
+    progress.update(status="resolving")
+
+    try:
+        company_details = resolve_company(company_name, company_link, force_refresh)
+    except LoginError:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        progress.update(status="failed", error=repr(e), finished_at=time())
+        return
+
+    progress.update(
+        status="queued", company=company_details['universal_name'],
+        internal_id=company_details['internal_id']
+    )
+
+    if any(sections.values()):
+        scrape_and_save.delay(
+            company_details, job_id=job_id, force_refresh=force_refresh, **sections
+        )
+    else:
+        progress.update(status="done", finished_at=time())
 
 
 @app.route("/scrape", methods=["POST"])
@@ -168,36 +602,136 @@ def scrape():
         return ({"error": "Provide atleast `company_name` or `company_link`"}, 400)
 
     try:
-        linked_in = LinkedInExtented(**get_li_creds())
-    except Exception:
-        return ({"error": "unable to login, check credentials in .env"}, 500)
+        company_details = company_cache.lookup(company_name, company_link)
+    except ValueError as e:
+        return ({"error": str(e)}, 400)
+
+    sections = [section for section in SECTIONS if response[section]]
+    force_refresh = body.get('force_refresh', False)
+
+    # every section already in flight (or fresh) in one job: that job is the answer
+    if company_details and sections and not force_refresh:
+        taken = single_flight.peek(company_details['internal_id'], sections)
+        if len(taken) == len(sections) and len(set(taken.values())) == 1:
+            response["job_id"] = taken[sections[0]]
+            response["attached"] = True
+            return (response, 202)
+
+    progress = JobProgress.create(
+        redis_client, sections, company_name=company_name, company_link=company_link
+    )
 
+    resolve_and_scrape.delay(
+        progress.job_id, company_name, company_link,
+        force_refresh=force_refresh, **response
+    )
 
-    try:
-        company_details = linked_in.get_company(
-            company_username=company_name,
-            company_link=company_link
+    response["job_id"] = progress.job_id
+
+    if company_name:
+        response["company_name"] = company_name
+
+    if company_link:
+        response["company_link"] = company_link
+
+    return (response, 202)
+
+
+@celery.task
+def scrape_batch(batch, force_refresh=False, **sections):
+    """
+    Resolve `batch`, a list of `(job_id, company_name, company_link)`, with
+    `BATCH_CONCURRENCY` threads and dispatch their sections as one group.
+    """
+
+    def resolve(job):
+        job_id, company_name, company_link = job
+        progress = JobProgress(redis_client, job_id)
+        progress.update(status="resolving")
+
+        with app.app_context():
+            try:
+                company_details = resolve_company(company_name, company_link, force_refresh)
+            except LoginError:
+                # retried on its own, the way a single /scrape is
+                resolve_and_scrape.apply_async(
+                    (job_id, company_name, company_link, force_refresh), sections, countdown=60
+                )
+                return None
+            except Exception as e:
+                db.session.rollback()
+                progress.update(status="failed", error=repr(e), finished_at=time())
+                return None
+
+        progress.update(
+            status="queued", company=company_details['universal_name'],
+            internal_id=company_details['internal_id']
         )
-    except Exception:
-        return ({"error": "Invalid Company Name or Link"}, 400)
+        return job_id, company_details
 
+    with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY) as executor:
+        resolved = [i for i in executor.map(resolve, batch) if i]
 
-    try:
-        bulk_upsert([company_details], models.CompanyBaseDetails)
-    except Exception:
-        return ({"error": "unable to do database operations"}, 500)
+    if not any(sections.values()):
+        for job_id, _ in resolved:
+            JobProgress(redis_client, job_id).update(status="done", finished_at=time())
+        return
 
+    group(
+        scrape_and_save.s(company_details, job_id=job_id, force_refresh=force_refresh, **sections)
+        for job_id, company_details in resolved
+    ).apply_async()
 
-    if any(response.values()):
-        scrape_and_save.delay(company_details, **response)
 
-    if company_name:
-        response["company_name"] = company_name
+def dispatch_batch(entries, sections, force_refresh=False):
+    """
+    Record a job per `(company_name, company_link)` entry and enqueue them
+    as `BATCH_SIZE` wide `scrape_batch` tasks.
+    """
+
+    enabled = [section for section in SECTIONS if sections.get(section)]
+    batch = [
+        (
+            JobProgress.create(
+                redis_client, enabled, company_name=company_name, company_link=company_link
+            ).job_id,
+            company_name, company_link
+        ) for company_name, company_link in entries
+    ]
+
+    for i in range(0, len(batch), BATCH_SIZE):
+        scrape_batch.delay(batch[i:i + BATCH_SIZE], force_refresh=force_refresh, **sections)
+
+    return {
+        (company_name or company_link): job_id for job_id, company_name, company_link in batch
+    }
+
+
+@app.route("/scrape/batch", methods=["POST"])
+def scrape_batch_view():
+    body = request.json
+    sections = {section: body.get(section, False) for section in SECTIONS}
+
+    companies = body.get('companies')
+    if not isinstance(companies, list):
+        return ({"error": "Provide a list of company names or links as `companies`"}, 400)
+
+    entries = dedupe_company_entries(companies)
+    if not entries:
+        return ({"error": "Provide a list of company names or links as `companies`"}, 400)
+
+    return ({
+        **sections,
+        "job_ids": dispatch_batch(entries, sections, body.get('force_refresh', False)),
+    }, 202)
 
-    if company_link:
-        response["company_link"] = company_link
 
-    return response
+@app.route("/scrape/<job_id>")
+def scrape_status(job_id):
+    job = JobProgress(redis_client, job_id).get()
+    if job is None:
+        return ({"error": "Unknown `job_id`"}, 404)
+    return job
 
 
 if __name__ == "__main__":
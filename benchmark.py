@@ -0,0 +1,68 @@
+"""
+Compare the loaders of `linkedin_employees_details` on synthetic rows.
+
+python benchmark.py -n 20000
+"""
+from time import perf_counter
+
+import argparse
+
+import models
+from models import db
+from app import app, bulk_upsert
+from bulk_load import copy_upsert
+
+
+def orm_upsert(raw_data, model_cls):
+    """
+    The original ORM path, one `merge` per row.
+    """
+
+    columns = [column.name for column in model_cls.__table__.columns]
+    for data in raw_data:
+        db.session.merge(model_cls(**{c: data.get(c) for c in columns}))
+    db.session.commit()
+
+
+def fake_employees(size, prefix):
+    return [
+        {
+            "public_id": f"{prefix}-{i}",
+            "firstName": "Bench",
+            "lastName": str(i),
+            "headline": "Benchmark \"row\"\twith\\escapes",
+            "student": bool(i % 2),
+            "experience": [{"title": "Engineer", "companyName": "Benchmark"}] * 3,
+            "education": [{"schoolName": "Benchmark"}],
+            "skills": ["python", "sql", "postgres"],
+            "followersCount": i,
+        } for i in range(size)
+    ]
+
+
+LOADERS = {"orm": orm_upsert, "insert": bulk_upsert, "copy": copy_upsert}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="LinkedIn-Benchmark")
+
+    parser.add_argument('-n', '--rows', type=int, default=10000, metavar='')
+    parser.add_argument('-l', '--loaders', nargs='+', default=list(LOADERS), choices=list(LOADERS))
+
+    args = parser.parse_args()
+
+    with app.app_context():
+        for name in args.loaders:
+            prefix = f"benchmark-{name}"
+            rows = fake_employees(args.rows, prefix)
+
+            for phase in ("insert", "update"):
+                started_at = perf_counter()
+                LOADERS[name](rows, models.EmployeeDetails)
+                elapsed = perf_counter() - started_at
+                print(f"{name:>8} {phase:>8}: {elapsed:8.3f}s {args.rows / elapsed:10.0f} rows/s")
+
+            models.EmployeeDetails.query.filter(
+                models.EmployeeDetails.public_id.like(f"{prefix}-%")
+            ).delete(synchronize_session=False)
+            db.session.commit()
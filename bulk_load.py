@@ -0,0 +1,194 @@
+import os
+import json
+from hashlib import sha1
+
+from psycopg2 import sql
+from sqlalchemy import and_, bindparam, types, update
+
+from models import db
+
+
+# a full `WriteBehind` batch (WRITE_BATCH_SIZE) goes through COPY, smaller flushes are inserted
+COPY_THRESHOLD = int(os.getenv("COPY_THRESHOLD", 500))
+
+# bookkeeping columns, a row is unchanged if only these differ
+UNHASHED_COLUMNS = {"content_hash", "scraped_at"}
+
+
+def to_pg_text(value, column_type):
+    """
+    Render `value` the way postgres would print it for `column_type`.
+    """
+
+    if value is None:
+        return None
+
+    if isinstance(column_type, types.ARRAY):
+        items = [to_pg_text(i, column_type.item_type) for i in value]
+        return "{" + ",".join(
+            "NULL" if i is None else '"' + i.replace("\\", "\\\\").replace('"', '\\"') + '"'
+            for i in items
+        ) + "}"
+
+    if isinstance(column_type, types.JSON):
+        return json.dumps(value)
+
+    if isinstance(value, bool):
+        return "t" if value else "f"
+
+    return str(value)
+
+
+def hash_rows(rows, table):
+    """
+    Add a `content_hash` to `rows` (dicts already trimmed to the columns of
+    `table`), for tables that track one.
+    """
+
+    if 'content_hash' not in table.c:
+        return rows
+
+    for row in rows:
+        row['content_hash'] = sha1(json.dumps(
+            {k: v for k, v in row.items() if k not in UNHASHED_COLUMNS}, sort_keys=True, default=str
+        ).encode()).hexdigest()
+    return rows
+
+
+def touch_rows(table, rows):
+    """
+    Refresh `scraped_at` of `rows` the upsert skipped as unchanged,
+    they were scraped all the same.
+    """
+
+    primary_keys = list(table.primary_key.columns)
+    rows = [row for row in rows if row.get('scraped_at')]
+    if 'scraped_at' not in table.c or not primary_keys or not rows:
+        return
+
+    db.session.execute(
+        update(table).where(
+            and_(*[c == bindparam(f"key_{c.name}") for c in primary_keys])
+        ).values(scraped_at=bindparam("touched_at")),
+        [
+            {**{f"key_{c.name}": row[c.name] for c in primary_keys}, "touched_at": row['scraped_at']}
+            for row in rows
+        ]
+    )
+
+
+def copy_escape(text):
+    if text is None:
+        return "\\N"
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class RowStream:
+    """
+    File-like object over `rows`, lets `COPY FROM STDIN` pull
+    lines lazily instead of rendering the whole batch upfront.
+    """
+
+    def __init__(self, rows, columns):
+        self.lines = (
+            "\t".join(copy_escape(to_pg_text(row.get(c.name), c.type)) for c in columns) + "\n"
+            for row in rows
+        )
+        self.buffer = ""
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            line = next(self.lines, None)
+            if line is None:
+                break
+            self.buffer += line
+
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+
+def copy_upsert(raw_data: list, model_cls: db.Model):
+    """
+    Stream `raw_data` into a temporary staging table with `COPY FROM STDIN`,
+    then merge it into the table of `model_cls` with one
+    `INSERT ... SELECT ... ON CONFLICT`.
+
+    Same return value as `app.bulk_upsert`, unchanged rows are skipped alike
+    but for their `scraped_at`.
+    """
+
+    table = getattr(model_cls, '__table__', model_cls)
+    columns = list(table.columns)
+    primary_keys = [column.name for column in table.primary_key.columns]
+    key_columns = primary_keys or [column.name for column in columns]
+
+    def key_of(data):
+        key = tuple(str(data.get(c)) for c in key_columns)
+        return key[0] if len(key) == 1 else key
+
+    rows = hash_rows(list({
+        key_of(data): {c.name: data.get(c.name) for c in columns} for data in raw_data
+    }.values()), table)
+
+    staging = sql.Identifier(f"staging_{table.name}")
+    column_list = sql.SQL(", ").join(sql.Identifier(c.name) for c in columns)
+    update_columns = [c.name for c in columns if c.name not in primary_keys]
+
+    if primary_keys and update_columns:
+        on_conflict = sql.SQL("ON CONFLICT ({}) DO UPDATE SET {}").format(
+            sql.SQL(", ").join(sql.Identifier(c) for c in primary_keys),
+            sql.SQL(", ").join(
+                sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(c)) for c in update_columns
+            ),
+        )
+        if 'content_hash' in table.c:
+            on_conflict += sql.SQL(
+                " WHERE {}.content_hash IS DISTINCT FROM EXCLUDED.content_hash"
+            ).format(sql.Identifier(table.name))
+    else:
+        on_conflict = sql.SQL("ON CONFLICT DO NOTHING")
+
+    cursor = db.session.connection().connection.cursor()
+
+    try:
+        cursor.execute(sql.SQL(
+            "CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP"
+        ).format(staging, sql.Identifier(table.name)))
+
+        cursor.copy_expert(
+            sql.SQL("COPY {} ({}) FROM STDIN").format(staging, column_list).as_string(cursor),
+            RowStream(rows, columns),
+        )
+
+        cursor.execute(sql.SQL(
+            "INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} {on_conflict} "
+            "RETURNING {keys}, xmax = 0"
+        ).format(
+            table=sql.Identifier(table.name), columns=column_list, staging=staging,
+            on_conflict=on_conflict,
+            keys=sql.SQL(", ").join(sql.Identifier(c) for c in key_columns),
+        ))
+
+        affected = {
+            key_of(dict(zip(key_columns, row[:-1]))): row[-1] for row in cursor.fetchall()
+        }
+
+        if 'scraped_at' in table.c and primary_keys:
+            cursor.execute(sql.SQL(
+                "UPDATE {table} SET scraped_at = s.scraped_at FROM {staging} s "
+                "WHERE {keys} AND {table}.scraped_at IS DISTINCT FROM s.scraped_at"
+            ).format(
+                table=sql.Identifier(table.name), staging=staging,
+                keys=sql.SQL(" AND ").join(
+                    sql.SQL("{0}.{1} = s.{1}").format(sql.Identifier(table.name), sql.Identifier(c))
+                    for c in primary_keys
+                ),
+            ))
+    finally:
+        cursor.close()
+
+    db.session.commit()
+
+    return affected
@@ -0,0 +1,130 @@
+import os
+import json
+import threading
+from time import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import redis
+from sqlalchemy import func
+
+import models
+from linkedin import company_slug
+
+
+COMPANY_COLUMNS = [column.name for column in models.CompanyBaseDetails.__table__.columns]
+
+
+def company_to_dict(company):
+    details = {c: getattr(company, c) for c in COMPANY_COLUMNS}
+    # `get_company` hands out ids and timestamps as strings, keep the same shape
+    details["internal_id"] = str(details["internal_id"])
+    details["scraped_at"] = str(details["scraped_at"]) if details["scraped_at"] else None
+    return details
+
+
+class CompanyCache:
+    """
+    Read-through cache for company resolution:
+    in-process LRU -> redis -> `linkedin_companies_base_details` -> Voyager.
+    """
+
+    prefix = "li:company:"
+    slug = staticmethod(company_slug)
+
+    def __init__(self, redis_url, ttl=None, size=None):
+        self.redis = redis.Redis.from_url(redis_url)
+        self.ttl = ttl or int(os.getenv("COMPANY_CACHE_TTL", 24 * 60 * 60))
+        self.size = size or int(os.getenv("COMPANY_CACHE_SIZE", 1024))
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _get_local(self, slug):
+        with self.lock:
+            cached = self.local.get(slug)
+            if cached is None:
+                return None
+            if cached[0] < time():
+                del self.local[slug]
+                return None
+            self.local.move_to_end(slug)
+            return cached[1]
+
+    def _set_local(self, slug, company_details, ttl):
+        with self.lock:
+            self.local[slug] = (time() + ttl, company_details)
+            self.local.move_to_end(slug)
+            while len(self.local) > self.size:
+                self.local.popitem(last=False)
+
+    def _get_db(self, slug):
+        company = models.CompanyBaseDetails.query.filter(
+            func.lower(models.CompanyBaseDetails.universal_name) == slug
+        ).first()
+
+        if company is None or company.scraped_at is None:
+            return None, 0
+
+        ttl = (company.scraped_at + timedelta(seconds=self.ttl) - datetime.utcnow()).total_seconds()
+        return (company_to_dict(company), ttl) if ttl > 0 else (None, 0)
+
+    def set(self, slug, company_details, ttl=None):
+        ttl = int(ttl or self.ttl)
+        self._set_local(slug, company_details, ttl)
+        self.redis.set(f"{self.prefix}{slug}", json.dumps(company_details), ex=ttl)
+
+    def invalidate(self, slug):
+        with self.lock:
+            self.local.pop(slug, None)
+        self.redis.delete(f"{self.prefix}{slug}")
+
+    def _lookup(self, slug):
+        company_details = self._get_local(slug)
+        if company_details is not None:
+            return company_details, "memory"
+
+        cached, ttl = self.redis.pipeline().get(
+            f"{self.prefix}{slug}"
+        ).ttl(f"{self.prefix}{slug}").execute()
+        if cached is not None:
+            company_details = json.loads(cached)
+            self._set_local(slug, company_details, max(ttl, 1))
+            return company_details, "redis"
+
+        company_details, ttl = self._get_db(slug)
+        if company_details is not None:
+            self.set(slug, company_details, ttl)
+            return company_details, "database"
+
+        return None, None
+
+    def lookup(self, company_name=None, company_link=None):
+        """
+        The cached company, None on a miss, Voyager is never called.
+        """
+
+        return self._lookup(self.slug(company_name, company_link))[0]
+
+    def resolve(self, fetch, company_name=None, company_link=None, force_refresh=False):
+        """
+        Resolve a company, `fetch(slug)` is only called on a miss or `force_refresh`.
+
+        :return: `(company_details, source)`, source being one of
+            "memory", "redis", "database" or "voyager"
+        """
+
+        slug = self.slug(company_name, company_link)
+
+        if not force_refresh:
+            company_details, source = self._lookup(slug)
+            if company_details is not None:
+                return company_details, source
+
+        company_details = fetch(slug)
+        if company_details:
+            self.set(slug, company_details)
+            # link and universal_name may differ in case or vanity
+            universal_name = (company_details.get("universal_name") or slug).lower()
+            if universal_name != slug:
+                self.set(universal_name, company_details)
+        return company_details, "voyager"
@@ -0,0 +1,145 @@
+import os
+import asyncio
+from time import time, sleep
+
+import redis
+
+
+# pick the least recently used account that is neither cooling down nor out of
+# budget for the current window, else the least recently used one anyway
+SELECT_ACCOUNT = """
+local accounts = redis.call('ZRANGE', KEYS[1], 0, -1)
+local chosen = accounts[1]
+for _, account in ipairs(accounts) do
+    if redis.call('EXISTS', ARGV[1] .. 'cooldown:' .. account) == 0 then
+        local used = tonumber(redis.call('GET', ARGV[1] .. 'budget:' .. account .. ':' .. ARGV[3]) or '0')
+        if used < tonumber(ARGV[4]) then
+            chosen = account
+            break
+        end
+    end
+end
+if chosen then
+    redis.call('ZADD', KEYS[1], ARGV[2], chosen)
+end
+return chosen
+"""
+
+
+def load_li_creds():
+    li_array_len, li_creds = int(os.getenv("LI_ARRAY_LEN", 0)), []
+
+    if li_array_len:
+        for i in range(0, li_array_len):
+            li_temp_email, li_temp_pass = os.getenv(f"LI_EMAIL_{i}"), os.getenv(f"LI_PASS_{i}")
+            if li_temp_email and li_temp_pass:
+                li_creds.append({"username": li_temp_email, "password": li_temp_pass})
+    else:
+        li_creds.append({"username": os.getenv("LI_EMAIL"), "password": os.getenv("LI_PASS")})
+
+    return li_creds
+
+
+class CredentialScheduler:
+    """
+    Hands out LinkedIn accounts through redis, so every gunicorn and celery
+    process shares the same rotation, request budgets and cool-downs.
+    """
+
+    prefix = "li:accounts:"
+
+    def __init__(self, redis_url, li_creds, budget=None, window=None, cooldown=None):
+        self.redis = redis.Redis.from_url(redis_url)
+        self.li_creds = {creds["username"]: creds for creds in li_creds}
+        self.budget = budget or int(os.getenv("LI_ACCOUNT_BUDGET", 300))
+        self.window = window or int(os.getenv("LI_ACCOUNT_WINDOW", 60 * 60))
+        self.cooldown_seconds = cooldown or int(os.getenv("LI_ACCOUNT_COOLDOWN", 15 * 60))
+        self.select_account = self.redis.register_script(SELECT_ACCOUNT)
+        self.registered = False
+
+    @property
+    def lru_key(self):
+        return f"{self.prefix}lru"
+
+    def _budget_key(self, username, window_idx):
+        return f"{self.prefix}budget:{username}:{window_idx}"
+
+    def _register(self):
+        # NX keeps the usage order already recorded by other processes
+        self.redis.zadd(self.lru_key, {username: 0 for username in self.li_creds}, nx=True)
+        self.registered = True
+
+    def next(self):
+        if not self.registered:
+            self._register()
+
+        username = self.select_account(
+            keys=[self.lru_key],
+            args=[self.prefix, time(), int(time() // self.window), self.budget]
+        )
+        username = username.decode() if username else None
+
+        # accounts removed from .env may still linger in redis
+        if username not in self.li_creds:
+            if username:
+                self.redis.zrem(self.lru_key, username)
+            return next(iter(self.li_creds.values()))
+
+        return self.li_creds[username]
+
+    def try_reserve(self, username):
+        """
+        Take one request from the budget of `username`, returns 0 if it was
+        taken, else the seconds to wait while the account cools down or its
+        budget is spent.
+        """
+
+        wait = self.redis.ttl(f"{self.prefix}cooldown:{username}")
+        if wait > 0:
+            return wait
+
+        now = time()
+        key = self._budget_key(username, int(now // self.window))
+        used, _ = self.redis.pipeline().incr(key).expire(key, self.window).execute()
+        if used <= self.budget:
+            return 0
+        return max(self.window - now % self.window, 1)
+
+    def reserve(self, username):
+        """
+        Blocking `try_reserve`, until the request is taken.
+        """
+
+        wait = self.try_reserve(username)
+        while wait:
+            sleep(wait)
+            wait = self.try_reserve(username)
+
+    async def areserve(self, username):
+        """
+        `reserve` for the event loop, waiting does not hold a thread.
+        """
+
+        wait = self.try_reserve(username)
+        while wait:
+            await asyncio.sleep(wait)
+            wait = self.try_reserve(username)
+
+    def cooldown(self, username, seconds=None):
+        self.redis.set(
+            f"{self.prefix}cooldown:{username}", 1, ex=int(seconds or self.cooldown_seconds)
+        )
+
+    def stats(self):
+        window_idx = int(time() // self.window)
+        return {
+            username: {
+                "last_used_at": score,
+                "used": int(self.redis.get(self._budget_key(username, window_idx)) or 0),
+                "budget": self.budget,
+                "cooldown": max(self.redis.ttl(f"{self.prefix}cooldown:{username}"), 0),
+            }
+            for username, score in (
+                (u.decode(), s) for u, s in self.redis.zrange(self.lru_key, 0, -1, withscores=True)
+            )
+        }
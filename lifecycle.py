@@ -0,0 +1,109 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from celery.signals import worker_process_init, worker_process_shutdown
+
+
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", 16))
+
+_loop, _executor = None, None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=WORKER_THREADS)
+    return _executor
+
+
+def get_loop():
+    """
+    The event loop of this process, made on first use,
+    with `get_executor()` as its default executor.
+    """
+
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        _loop.set_default_executor(get_executor())
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def close_loop():
+    global _loop, _executor
+
+    if _loop is not None and not _loop.is_closed():
+        pending = [task for task in asyncio.all_tasks(_loop) if not task.done()]
+        for task in pending:
+            task.cancel()
+        _loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        _loop.run_until_complete(_loop.shutdown_asyncgens())
+        _loop.close()
+
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+
+    _loop, _executor = None, None
+
+
+class WorkerLifecycle:
+    """
+    Process wide resources of a celery worker: one event loop, one thread
+    pool and one pooled engine per (prefork) process, set up on
+    `worker_process_init` and torn down on `worker_process_shutdown`.
+    Every task also runs in an app context of its own, whose teardown
+    removes its scoped session.
+    """
+
+    def __init__(self):
+        self.app, self.db = None, None
+        self.shutdown_hooks = []
+
+    def init_app(self, app, db, celery):
+        self.app, self.db = app, db
+
+        class ContextTask(celery.Task):
+            def __call__(self, *args, **kwargs):
+                with app.app_context():
+                    return super().__call__(*args, **kwargs)
+
+        # tasks, and task bases, defined after this run in an app context
+        celery.Task = ContextTask
+
+        worker_process_init.connect(self.process_init, weak=False)
+        worker_process_shutdown.connect(self.process_shutdown, weak=False)
+
+    def on_shutdown(self, hook):
+        """
+        Await `hook()` on the loop before it is closed, e.g. to close http clients.
+        """
+
+        self.shutdown_hooks.append(hook)
+
+    def process_init(self, **kwargs):
+        global _loop, _executor
+
+        # loop, threads and connections of the parent do not survive the fork
+        _loop, _executor = None, None
+        with self.app.app_context():
+            self.db.engine.dispose()
+
+        get_loop()
+
+    def process_shutdown(self, **kwargs):
+        loop = get_loop()
+        for hook in self.shutdown_hooks:
+            try:
+                loop.run_until_complete(hook())
+            except Exception as e:
+                self.app.logger.error(f"shutdown hook {hook!r} failed: {e!r}")
+
+        close_loop()
+
+        with self.app.app_context():
+            self.db.engine.dispose()
+
+
+worker_lifecycle = WorkerLifecycle()
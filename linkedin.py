@@ -1,40 +1,266 @@
+import os
+import sys
+import json
 import asyncio
+import threading
+from time import time
+from itertools import product
 from functools import partial
 from copy import deepcopy
+from hashlib import blake2b
 from datetime import datetime
-from time import sleep as blocking_sleep
+from urllib.parse import urlencode
 
 from linkedin_api.linkedin import Linkedin, default_evade
 
+from throttle import AdaptiveLimiter, Pacer
+from transport import AsyncTransport
+from lifecycle import get_loop
+
+
+EVENT_TIME_FRAMES = ("UPCOMING", "TODAY", "PAST")
+
 
 class UnImplementedError(Exception):
     pass
 
 
+class FetchError(Exception):
+    """
+    A page could not be fetched, so pagination stopped short of the end.
+    """
+
+    def __init__(self, status_code):
+        super().__init__(f"request failed: {status_code}")
+        self.status_code = status_code
+
+
+def company_slug(company_name=None, company_link=None):
+    return (company_name or LinkedInExtented.get_company_username(company_link)).lower()
+
+
+def dedupe_company_entries(entries):
+    """
+    Turn company names or links into unique `(company_name, company_link)` pairs,
+    entries that are neither, or not strings, are dropped.
+    """
+
+    unique = {}
+    for entry in entries:
+        if not isinstance(entry, str):
+            continue
+        entry = entry.strip()
+        if not entry:
+            continue
+        company_name, company_link = (None, entry) if '/company/' in entry else (entry, None)
+        try:
+            unique.setdefault(company_slug(company_name, company_link), (company_name, company_link))
+        except ValueError:
+            continue
+    return list(unique.values())
+
+
+async def merge_async(iterators):
+    """
+    Consume a dict of async iterators concurrently,
+    yielding `(key, item)` in the order items arrive.
+    """
+
+    queue, done = asyncio.Queue(), object()
+
+    async def drain(key, iterator):
+        try:
+            async for item in iterator:
+                await queue.put((key, item))
+        finally:
+            await queue.put((key, done))
+
+    tasks = [asyncio.ensure_future(drain(k, i)) for k, i in iterators.items()]
+    running = len(tasks)
+
+    try:
+        while running:
+            key, item = await queue.get()
+            if item is done:
+                running -= 1
+            else:
+                yield key, item
+        # surface the first failure, if any
+        for task in tasks:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class CompactSet:
+    """
+    Set of strings kept as 64 bit digests, which take about half the memory
+    of the strings for public_ids, collisions being negligible at that size.
+    """
+
+    def __init__(self):
+        self.digests = set()
+
+    @staticmethod
+    def digest(value):
+        return int.from_bytes(blake2b(value.encode(), digest_size=8).digest(), "big")
+
+    def add(self, value):
+        """
+        Add `value`, returns False if it was already there.
+        """
+
+        digest = self.digest(value)
+        if digest in self.digests:
+            return False
+        self.digests.add(digest)
+        return True
+
+    def __contains__(self, value):
+        return self.digest(value) in self.digests
+
+    def __len__(self):
+        return len(self.digests)
+
+
 class LinkedInExtented(Linkedin):
 
-    loop = asyncio.get_event_loop()
     asyncronize = lambda self, func, *args: self.loop.run_in_executor(None, func, *args)
 
+    requests_per_second = float(os.getenv("LI_REQUESTS_PER_SECOND", 1))
+    max_requests_per_second = float(os.getenv("LI_MAX_REQUESTS_PER_SECOND", 4))
+    max_concurrency = int(os.getenv("LI_MAX_CONCURRENCY", 8))
+    max_retries = int(os.getenv("LI_MAX_RETRIES", 3))
+    backoff = float(os.getenv("LI_BACKOFF", 2))
+    max_backoff = float(os.getenv("LI_MAX_BACKOFF", 300))
+    employee_workers = int(os.getenv("LI_EMPLOYEE_WORKERS", 4))
+    # big enough for a chunk to fill a write batch, and reach COPY_THRESHOLD
+    employee_chunk_size = int(os.getenv("LI_EMPLOYEE_CHUNK_SIZE", 500))
+    events_page_size = int(os.getenv("LI_EVENTS_PAGE_SIZE", 100))
+    events_page_window = int(os.getenv("LI_EVENTS_PAGE_WINDOW", 3))
+    native_transport = os.getenv("LI_NATIVE_ASYNC", "1") == "1"
+    on_discard = None
+
+    # jobs are searched in one shard per combination of these facet values,
+    # locations only cover every job if the listed ones do
+    job_types = [i for i in os.getenv("LI_JOB_TYPES", "F,P,C,T,I,V,O").split(",") if i]
+    job_experience = [i for i in os.getenv("LI_JOB_EXPERIENCE", "").split(",") if i]
+    job_locations = [i for i in os.getenv("LI_JOB_LOCATIONS", "").split(",") if i]
+
+    # same for the employee search, regions (geo urn ids) and titles are not exhaustive
+    employee_network_depths = [i for i in os.getenv("LI_EMPLOYEE_NETWORK_DEPTHS", "F,S,O").split(",") if i]
+    employee_regions = [i for i in os.getenv("LI_EMPLOYEE_REGIONS", "").split(",") if i]
+    employee_titles = [i for i in os.getenv("LI_EMPLOYEE_TITLES", "").split(",") if i]
+
+    def __init__(
+        self, username, password, *, requests_per_second=None, employee_workers=None,
+        scheduler=None, **kwargs
+    ):
+        super().__init__(username, password, **kwargs)
+
+        self.username, self.password = username, password
+        self.scheduler = scheduler
+        self.refresh_lock, self.refresh_count = threading.Lock(), 0
+
+        self.requests_per_second = requests_per_second or self.requests_per_second
+        self.employee_workers = employee_workers or self.employee_workers
+        self.limiter = AdaptiveLimiter(
+            self.requests_per_second, max_rate=max(self.requests_per_second, self.max_requests_per_second),
+            max_concurrency=self.max_concurrency, backoff=self.backoff, max_backoff=self.max_backoff
+        )
+        self.pacer = Pacer(
+            self.limiter, self.max_retries, scheduler, username,
+            on_exhausted=self.cool_down, logger=self.logger
+        )
+        self.transport = AsyncTransport(self)
+
+    async def call(self, method, *args, **kwargs):
+        """
+        Await a blocking, fetching `method` of this client, natively through
+        `transport` unless `native_transport` is off, then in the executor.
+        """
+
+        if self.native_transport:
+            return await self.transport.replay(method, *args, **kwargs)
+
+        return await self.asyncronize(partial(method, *args, **kwargs))
+
+    def discard(self):
+        """
+        Drop this client from the pool it came from, its account can't be used for now.
+        """
+
+        if self.on_discard is not None:
+            self.on_discard()
+
+    def cool_down(self, retry_after=None):
+        if self.scheduler is not None:
+            self.scheduler.cooldown(self.username, retry_after)
+        self.discard()
+
+    @property
+    def loop(self):
+        return get_loop()
+
+    @property
+    def csrf_token(self):
+        return (self.client.session.cookies.get_dict().get('JSESSIONID') or '').replace('"', '')
+
+    @property
+    def session_expired(self):
+        for cookie in self.client.session.cookies:
+            if cookie.name == "JSESSIONID" and cookie.value:
+                return bool(cookie.expires) and cookie.expires <= time()
+        return True
+
+    def refresh_session(self, stale_token=None):
+        """
+        Log in again, unless another thread already did since `stale_token` was seen.
+        """
+
+        with self.refresh_lock:
+            if stale_token is not None and stale_token != self.csrf_token:
+                return
+            try:
+                self.client._do_authentication_request(self.username, self.password)
+                self.client._fetch_metadata()
+            except Exception:
+                self.discard()
+                raise
+            self.refresh_count += 1
 
     def _fetch(self, uri, evade=default_evade, base_request=False, headers={}, **kwargs):
         """
-        override this command to add auth.
+        override this command to add auth, re-login once on 401/403.
+        `evade` is ignored, pacing is left to `limiter`.
         """
 
-        headers = headers or kwargs.get("headers", {})
-        headers.update({
-            'csrf-token': self.client.session.cookies.get_dict().get('JSESSIONID').replace('"','')
-        })
-        kwargs.update({"headers": headers})
+        csrf_token = self.csrf_token
+        res = self._paced_fetch(
+            uri, base_request, headers={**headers, 'csrf-token': csrf_token}, **kwargs
+        )
+
+        if res.status_code in (401, 403):
+            self.logger.info(f"request failed: {res.status_code}, refreshing session")
+            self.refresh_session(csrf_token)
+            res = self._paced_fetch(
+                uri, base_request, headers={**headers, 'csrf-token': self.csrf_token}, **kwargs
+            )
 
-        return super()._fetch(uri, evade, base_request, **kwargs)
+        return res
+
+    def _paced_fetch(self, uri, base_request, **kwargs):
+        return self.pacer.send(partial(
+            super()._fetch, uri, evade=lambda: None, base_request=base_request, **kwargs
+        ))
 
     def _post(self, *args, **kwargs):
         raise UnImplementedError()
 
 
-    def get_company_username(self, company_link):
+    @staticmethod
+    def get_company_username(company_link):
         try:
             company_username = company_link.split('.com/company/')[1].replace('/','')
         except:
@@ -58,9 +284,9 @@ class LinkedInExtented(Linkedin):
 
         if not company_username:
             try:
-                company_username = company_link.split('.com/company/')[1].replace('/','')
-            except:
-                raise AttributeError("Use company link like https://www.linkedin.com/company/unilever/ only!")
+                company_username = self.get_company_username(company_link)
+            except ValueError as e:
+                raise AttributeError(str(e))
 
         params = {
             "decorationId": "com.linkedin.voyager.dash.deco.organization.MemberCompany-65",
@@ -94,22 +320,111 @@ class LinkedInExtented(Linkedin):
             "description": resp.get("description"),
             "founded_on": resp.get("foundedOn", {}).get('year'),
             "industry": [i['name'] for i in resp.get("industry", {}).values()],
+            "scraped_at": str(datetime.utcnow()),
         }
 
-    async def get_jobs(self, company_details):
+    async def aget_company(self, company_username=None, company_link=None):
+        return await self.call(
+            self.get_company, company_username=company_username, company_link=company_link
+        )
 
-        resp = await self.asyncronize(
-            partial(
-                super().search_jobs,
-                keywords=company_details['display_name'],
-                companies=[company_details['internal_id']],
-                remote=True, listed_at=24 * 60 * 60 * 1000
-            )
+    def job_shards(self):
+        """
+        Disjoint slices of the jobs search, as facet to value dicts.
+        """
+
+        facets = [
+            (facet, values) for facet, values in (
+                ("jobType", self.job_types),
+                ("experience", self.job_experience),
+                ("locationFallback", self.job_locations),
+            ) if values
+        ]
+        return [
+            dict(zip([facet for facet, _ in facets], values))
+            for values in product(*[values for _, values in facets])
+        ]
+
+    def _search_jobs(self, company_details, start=0, listed_within=None, shard=None):
+        """
+        One page of remote jobs of a company, newest first,
+        `listed_within` seconds bounds how old they can be.
+        """
+
+        filters = [
+            "resultType->JOBS", f"company->{company_details['internal_id']}", "commuteFeatures->f_WRA"
+        ]
+        if listed_within:
+            filters.append(f"timePostedRange->r{int(listed_within)}")
+        filters.extend(f"{facet}->{value}" for facet, value in (shard or {}).items())
+
+        params = {
+            "decorationId": "com.linkedin.voyager.deco.jserp.WebJobSearchHitWithSalary-14",
+            "count": self._MAX_SEARCH_COUNT,
+            "filters": f"List({','.join(filters)})",
+            "origin": "JOB_SEARCH_RESULTS_PAGE",
+            "q": "jserpFilters",
+            "start": start,
+            "sortBy": "DD",
+            "queryContext": "List(primaryHitType->JOBS,spellCorrectionEnabled->true)",
+        }
+
+        res = self._fetch(
+            f"/search/hits?{urlencode(params, safe='(),')}",
+            headers={"accept": "application/vnd.linkedin.normalized+json+2.1"},
         )
 
+        # an empty page would read as the last one
+        if res.status_code != 200:
+            raise FetchError(res.status_code)
+
         return [
-            {
-                "job_id": i.get('*savingInfo', ":").split(':')[-1],
+            i for i in res.json().get("included", [])
+            if i["$type"] == "com.linkedin.voyager.jobs.JobPosting"
+        ]
+
+    async def iter_job_shard(self, company_details, shard, since=None):
+        """
+        Paginate a shard of `job_shards` till the end, or till the first
+        page of jobs listed before `since` (a datetime).
+        """
+
+        since_ms = since.timestamp() * 1000 if since else None
+        # an hour of slack for clock drift between runs
+        listed_within = time() - since.timestamp() + 60 * 60 if since else None
+
+        start = 0
+        while start < self._MAX_SEARCH_COUNT * self._MAX_REPEATED_REQUESTS:
+            page = await self.call(self._search_jobs, company_details, start, listed_within, shard)
+            for job in page:
+                yield job
+
+            if not page or (since_ms and all(i.get('listedAt', 0) <= since_ms for i in page)):
+                return
+            start += len(page)
+
+    async def iter_jobs(self, company_details, since=None):
+        """
+        Jobs of a company as they are found, every shard of `job_shards` is
+        searched concurrently and jobs are deduplicated by `job_id`.
+        """
+
+        seen = set()
+
+        async for _, i in merge_async({
+            idx: self.iter_job_shard(company_details, shard, since)
+            for idx, shard in enumerate(self.job_shards())
+        }):
+            if i.get('companyDetails', {}).get('company', ':').split(':')[-1] != company_details['internal_id']:
+                continue
+
+            job_id = i.get('*savingInfo', ":").split(':')[-1]
+            if job_id in seen:
+                continue
+            seen.add(job_id)
+
+            yield {
+                "job_id": job_id,
                 "job_state": i.get('jobState'),
                 "title": i.get('title'),
                 "location": i.get('formattedLocation'),
@@ -117,38 +432,74 @@ class LinkedInExtented(Linkedin):
                 "expire_at": str(datetime.fromtimestamp(int(i.get('expireAt', 0)/1000))),
                 "company_id": company_details['internal_id']
             }
-             for i in resp if i.get(
-                'companyDetails', {}
-            ).get('company', ':').split(':')[-1]==company_details['internal_id']
-        ]
 
-    async def get_company_posts(self, company_details):
-        resp = await self.asyncronize(
-            super().get_company_updates, company_details['internal_id']
-        )
+    async def get_jobs(self, company_details, since=None):
+        """
+        Jobs of a company, only the ones listed after `since` (a datetime)
+        are searched for.
+        """
+
+        return [job async for job in self.iter_jobs(company_details, since)]
+
+    def _get_company_updates(self, company_details, start=0):
+        params = {
+            "companyUniversalName": company_details['internal_id'],
+            "q": "companyFeedByUniversalName",
+            "moduleKey": "member-share",
+            "count": self._MAX_UPDATE_COUNT,
+            "start": start,
+        }
+
+        res = self._fetch(f"/feed/updates", params=params)
+
+        if res.status_code != 200:
+            raise FetchError(res.status_code)
+
+        return res.json().get("elements", [])
+
+    async def iter_company_posts(self, company_details, until_link=None):
+        """
+        Posts of a company, newest first, a page at a time,
+        paginating stops at `until_link`.
+        """
+
         render_api = 'com.linkedin.voyager.feed.render.UpdateV2'
-        return [
-            {
-                "link": i['permalink'],
-                "content": i['value'][render_api]['content'],
-                "commentary": i['value'][render_api].get('commentary', ''),
-                "company_id": company_details['internal_id']
-            }
-            for i in resp if 'content' in i['value'][render_api].keys()
-        ]
 
-    def _get_company_events(self, company_details, time_frame):
+        start = 0
+        while start < self._MAX_UPDATE_COUNT * self._MAX_REPEATED_REQUESTS:
+            page = await self.call(self._get_company_updates, company_details, start)
+            links = [i.get('permalink') for i in page]
+
+            reached = until_link in links
+            for i in page[:links.index(until_link)] if reached else page:
+                if 'content' in i['value'][render_api].keys():
+                    yield {
+                        "link": i['permalink'],
+                        "content": i['value'][render_api]['content'],
+                        "commentary": i['value'][render_api].get('commentary', ''),
+                        "company_id": company_details['internal_id']
+                    }
+
+            if reached or not page:
+                return
+            start += len(page)
+
+    async def get_company_posts(self, company_details, until_link=None):
+        return [post async for post in self.iter_company_posts(company_details, until_link)]
+
+    def _get_company_events(self, company_details, time_frame, start=0, count=None):
         params = {
             "decorationId": "com.linkedin.voyager.deco.organization.web.WebListedOrganizationEvent-6",
             "organizationIdOrUniversalName": company_details['universal_name'],
-            "q": "timeFrame", "timeFrame": time_frame, "start": 0, "count": 100
+            "q": "timeFrame", "timeFrame": time_frame,
+            "start": start, "count": count or self.events_page_size
         }
 
         res = self._fetch(f"/voyagerOrganizationOrganizationEvents", params=params)
 
         if res.status_code != 200:
             self.logger.info(f"request failed: {res.status_code}")
-            return {}
+            return []
 
 
         try:
@@ -156,9 +507,13 @@ class LinkedInExtented(Linkedin):
         except IndexError:
             raise ValueError("Incorrect `company_username`")
 
+        # events without a vanity name are told apart by their urn
         return [
             {
-                "event_id": i.get('eventResolutionResult', {}).get('vanityName'),
+                "event_id": (
+                    i.get('eventResolutionResult', {}).get('vanityName')
+                    or i.get('eventResolutionResult', {}).get('entityUrn')
+                ),
                 "state": i.get('eventResolutionResult', {}).get("lifecycleState"),
                 "name": i.get('eventResolutionResult', {}).get('localizedName'),
                 "description": i.get('eventResolutionResult', {}).get('localizedDescription', {}).get('text'),
@@ -168,55 +523,212 @@ class LinkedInExtented(Linkedin):
             } for i in resp
         ]
 
-    async def get_company_events(self, company_details):
+    async def iter_company_events(self, company_details, time_frame):
+        """
+        Paginate a `time_frame` till the end, keeping `events_page_window`
+        pages in flight at once.
+        """
+
+        start, seen = 0, set()
+
+        while True:
+            pages = await asyncio.gather(*[
+                self.call(
+                    self._get_company_events, company_details, time_frame,
+                    start + i * self.events_page_size, self.events_page_size
+                ) for i in range(self.events_page_window)
+            ])
+
+            for page in pages:
+                for event in page:
+                    if event['event_id'] is None:
+                        yield event
+                    elif event['event_id'] not in seen:
+                        seen.add(event['event_id'])
+                        yield event
+
+            if any(len(page) < self.events_page_size for page in pages):
+                return
+
+            start += self.events_page_window * self.events_page_size
+
+    async def stream_company_events(self, company_details):
+        async for time_frame, event in merge_async({
+            time_frame: self.iter_company_events(company_details, time_frame)
+            for time_frame in EVENT_TIME_FRAMES
+        }):
+            yield event
+
+    async def get_company_events(self, company_details, stream=False):
+        """
+        Fetch events of every time frame concurrently, as an async iterator
+        if `stream` else as a dict of time frame to events.
+        """
+
+        if stream:
+            return self.stream_company_events(company_details)
+
+        events = {time_frame: [] for time_frame in EVENT_TIME_FRAMES}
+        async for time_frame, event in merge_async({
+            time_frame: self.iter_company_events(company_details, time_frame)
+            for time_frame in EVENT_TIME_FRAMES
+        }):
+            events[time_frame].append(event)
+        return events
+
+    async def _get_employee(self, public_id):
+        profile, contact_info, network_info, skills = await asyncio.gather(
+            self.call(self.get_profile, public_id),
+            self.call(self.get_profile_contact_info, public_id),
+            self.call(self.get_profile_network_info, public_id),
+            self.call(self.get_profile_skills, public_id),
+        )
+
+        # `get_profile` answers {} to an error body, e.g. a throttled response,
+        # saving it would blank the profile and mark it fresh
+        if not profile:
+            raise ValueError("empty profile")
+
         return {
-            "UPCOMING": await self.asyncronize(
-                self._get_company_events, company_details, "UPCOMING"
-            ),
-            "TODAY": await self.asyncronize(
-                self._get_company_events, company_details, "TODAY"
-            ),
-            "PAST": await self.asyncronize(
-                self._get_company_events, company_details, "PAST"
-            ),
+            "public_id": public_id,
+            **profile,
+            **contact_info,
+            **network_info,
+            "skills": [i['name'] for i in skills],
+            "scraped_at": str(datetime.utcnow()),
         }
 
-    async def _get_employees(self, public_id_list):
+    async def enrich_employees(self, public_ids):
+        """
+        Fetch profiles of `public_ids`, a list or an async iterator, with a
+        pool of `employee_workers`, yielding every employee as soon as it is
+        fetched. An async iterator is consumed only as fast as the pool goes.
+        """
+
+        pending = asyncio.Queue(self.employee_workers * 2)
+        results = asyncio.Queue()
 
-        blocking_sleep(300)
+        async def feed():
+            try:
+                if hasattr(public_ids, '__aiter__'):
+                    async for public_id in public_ids:
+                        await pending.put(public_id)
+                else:
+                    for public_id in public_ids:
+                        await pending.put(public_id)
+            except Exception:
+                await pending.put(None)
+                raise
+            await pending.put(None)
+
+        async def worker():
+            while True:
+                public_id = await pending.get()
+                if public_id is None:
+                    # pass the end on to the other workers
+                    await pending.put(None)
+                    break
+                try:
+                    await results.put(await self._get_employee(public_id))
+                except Exception as e:
+                    self.logger.info(f"unable to fetch employee {public_id}: {e}")
+            await results.put(None)
+
+        feeder = asyncio.ensure_future(feed())
+        workers = [
+            asyncio.ensure_future(worker()) for _ in range(self.employee_workers)
+        ]
+        running = len(workers)
 
-        result = []
+        try:
+            while running:
+                employee = await results.get()
+                if employee is None:
+                    running -= 1
+                else:
+                    yield employee
+            # surface a failed search
+            feeder.result()
+        finally:
+            for task in [feeder, *workers]:
+                task.cancel()
 
-        for public_id in public_id_list:
-            result.append({
-                "public_id": public_id,
-                **await self.asyncronize(self.get_profile, public_id),
-                **await self.asyncronize(self.get_profile_contact_info, public_id),
-                **await self.asyncronize(self.get_profile_network_info, public_id),
-                "skills": [
-                    i['name'] for i in await self.asyncronize(
-                        self.get_profile_skills, public_id
-                    )
-                ],
-            })
+    async def _get_employees(self, public_id_list):
+        return [employee async for employee in self.enrich_employees(public_id_list)]
 
-        return result
+    async def get_employees(self, company_details):
+        func_list = await self.get_employees_functions(company_details)
+        return [
+            employee for chunk in await asyncio.gather(*[func() for func in func_list])
+            for employee in chunk
+        ]
 
+    def employee_shards(self):
+        """
+        Slices of the employee search, as `search_people` keyword arguments.
+        """
 
-    async def get_employees_functions(self, company_details):
+        facets = [
+            (facet, values) for facet, values in (
+                # `network_depths` of `search_people` is broken, the deprecated single one is not
+                ("network_depth", self.employee_network_depths),
+                ("regions", [[i] for i in self.employee_regions]),
+                ("keyword_title", self.employee_titles),
+            ) if values
+        ]
+        return [
+            dict(zip([facet for facet, _ in facets], values))
+            for values in product(*[values for _, values in facets])
+        ]
 
-        resp = await self.asyncronize(
-            partial(
-                super().search_people,
-                keyword_company=company_details['display_name'],
-                current_company=[company_details['internal_id']]
-            )
+    def _search_employees(self, company_details, shard, start=0):
+        # private profiles are kept so that only the end of the results is an empty page
+        return super().search_people(
+            keyword_company=company_details['display_name'],
+            current_company=[company_details['internal_id']],
+            include_private_profiles=True,
+            limit=self._MAX_SEARCH_COUNT, offset=start,
+            **shard
         )
 
-        public_id_megalist = list(set([i['public_id'] for i in resp]))
+    async def iter_employee_shard(self, company_details, shard):
+        start = 0
+        while start < self._MAX_SEARCH_COUNT * self._MAX_REPEATED_REQUESTS:
+            page = await self.call(self._search_employees, company_details, shard, start)
+            for i in page:
+                if i['public_id']:
+                    yield i['public_id']
+
+            if not page:
+                return
+            start += len(page)
+
+    async def iter_employee_ids(self, company_details, skip=()):
+        """
+        public_ids of the employees of a company as they are found, every shard
+        of `employee_shards` is searched concurrently.
+        """
+
+        seen = CompactSet()
+
+        async for _, public_id in merge_async({
+            idx: self.iter_employee_shard(company_details, shard)
+            for idx, shard in enumerate(self.employee_shards())
+        }):
+            if public_id not in skip and seen.add(public_id):
+                yield public_id
 
+    async def search_employee_ids(self, company_details):
+        return [public_id async for public_id in self.iter_employee_ids(company_details)]
+
+    async def iter_employees(self, company_details, skip=()):
+        async for employee in self.enrich_employees(self.iter_employee_ids(company_details, skip)):
+            yield employee
+
+    def employees_functions(self, public_id_megalist):
         public_id_chunks = [
-            public_id_megalist[i:i + 1] for i in range(0, len(public_id_megalist), 1)
+            public_id_megalist[i:i + self.employee_chunk_size]
+            for i in range(0, len(public_id_megalist), self.employee_chunk_size)
         ]
 
         function_list = []
@@ -227,18 +739,153 @@ class LinkedInExtented(Linkedin):
             )
         return function_list
 
+    async def get_employees_functions(self, company_details):
+
+        public_id_megalist = await self.search_employee_ids(company_details)
+
+        return self.employees_functions(public_id_megalist)
+
 
 def get_li_creds():
     os.environ['LI_CURRENT_IDX'] = str((int(os.environ['LI_CURRENT_IDX']) + 1) % max(li_array_len , 1))
     return li_creds[int(os.environ['LI_CURRENT_IDX'])]
 
 
+async def collect_company(linked_in, company_details, jobs=False, posts=False, employees=False, events=False):
+    final_company_details = deepcopy(company_details)
+
+    sections = {}
+    if jobs:
+        sections['jobs'] = linked_in.get_jobs(company_details)
+    if posts:
+        sections['posts'] = linked_in.get_company_posts(company_details)
+    if employees:
+        sections['employees'] = linked_in.get_employees(company_details)
+    if events:
+        sections['events'] = linked_in.get_company_events(company_details)
+
+    for section, result in zip(sections, await asyncio.gather(*sections.values())):
+        final_company_details[section] = result
+
+    return final_company_details
+
+
+async def then_none(iterator):
+    async for item in iterator:
+        yield item
+    yield None
+
+
+def stream_company(linked_in, company_details, sections, skip=None):
+    """
+    Async iterator of `(section, record)` for every enabled section, as they
+    are fetched, a section ends with a `(section, None)`. `skip` maps a section to `True` (already done) or to a set
+    of employee public_ids already scraped.
+    """
+
+    skip = skip or {}
+    iterators = {}
+
+    if sections.get('jobs') and skip.get('jobs') is not True:
+        iterators['jobs'] = linked_in.iter_jobs(company_details)
+    if sections.get('posts') and skip.get('posts') is not True:
+        iterators['posts'] = linked_in.iter_company_posts(company_details)
+    if sections.get('events') and skip.get('events') is not True:
+        iterators['events'] = linked_in.stream_company_events(company_details)
+    if sections.get('employees') and skip.get('employees') is not True:
+        iterators['employees'] = linked_in.iter_employees(
+            company_details, skip=skip.get('employees') or ()
+        )
+
+    return merge_async({k: then_none(i) for k, i in iterators.items()})
+
+
+class NDJSONWriter:
+    """
+    Writes one json record per line and flushes it right away. When appending
+    to an existing file, what it already holds is read back as `done`, so
+    that an interrupted scrape can resume.
+    """
+
+    def __init__(self, path=None):
+        # {company: {section: True | {public_id, ...}}}
+        self.done = {}
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # last line of a crashed run
+                    self._mark(record)
+
+        self.stream = open(path, 'a') if path else sys.stdout
+
+    def _mark(self, record):
+        company = self.done.setdefault(record['company'], {})
+        if record.get('done'):
+            company[record['section']] = True
+        elif record['section'] == 'employees' and company.get('employees') is not True:
+            company.setdefault('employees', set()).add(record['data']['public_id'])
+
+    def write(self, company, section, data=None, done=False):
+        record = {"company": company, "section": section}
+        if done:
+            record["done"] = True
+        else:
+            record["data"] = data
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+async def stream_companies(linked_in, companies, sections, writer, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def stream(company_details):
+        company = company_details['universal_name']
+        skip = writer.done.get(company, {})
+
+        async with semaphore:
+            if skip.get('company') is not True:
+                writer.write(company, 'company', company_details)
+                writer.write(company, 'company', done=True)
+
+            async for section, record in stream_company(linked_in, company_details, sections, skip):
+                writer.write(company, section, record, done=record is None)
+
+    await asyncio.gather(*[stream(i) for i in companies])
+
+
+async def resolve_companies(linked_in, entries, concurrency):
+    """
+    Resolve `(company_name, company_link)` entries concurrently,
+    companies that fail to resolve are logged and left out.
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def resolve(company_name, company_link):
+        async with semaphore:
+            try:
+                return await linked_in.aget_company(
+                    company_username=company_name, company_link=company_link
+                )
+            except Exception as e:
+                linked_in.logger.info(f"unable to resolve {company_name or company_link}: {e}")
+
+    return [
+        i for i in await asyncio.gather(*[resolve(*entry) for entry in entries]) if i
+    ]
+
+
 # python linkedin.py -n appsmith-au -j -p -e -E
+# python linkedin.py -i companies.txt -j -p
 if __name__ == "__main__":
-    import os
-    import sys
-    import json
-
     import argparse
     from dotenv import load_dotenv
 
@@ -264,41 +911,73 @@ if __name__ == "__main__":
     parser.add_argument('-p', '--posts', action='store_true')
     parser.add_argument('-e', '--employees', action='store_true')
     parser.add_argument('-E', '--events', action='store_true')
+    parser.add_argument('-i', '--input', type=str, metavar='', help="file with a company name or link per line")
+    parser.add_argument('-c', '--concurrency', type=int, default=4, metavar='')
+    parser.add_argument('--enqueue', action='store_true', help="dispatch --input to celery instead")
+    parser.add_argument('-s', '--stream', action='store_true', help="write one NDJSON record per item")
+    parser.add_argument('-o', '--output', type=str, metavar='', help="--stream to (and resume from) a file")
 
     args = parser.parse_args()
+    sections = {
+        "jobs": args.jobs, "posts": args.posts, "employees": args.employees, "events": args.events
+    }
 
-    linked_in = LinkedInExtented(**get_li_creds(), refresh_cookies=False)
+    if args.input:
+        with open(args.input) as f:
+            entries = dedupe_company_entries(f.read().splitlines())
 
-    company_details = linked_in.get_company(
-        company_username=args.company_name, company_link=args.company_link
-    )
-    final_company_details = deepcopy(company_details)
+        if args.enqueue:
+            from app import dispatch_batch
 
-    if args.jobs:
-        final_company_details['jobs'] = linked_in.loop.run_until_complete(
-            linked_in.get_jobs(company_details)
-        )
+            sys.stdout.write(json.dumps(dispatch_batch(entries, sections)))
+            sys.exit()
 
-    if args.posts:
-        final_company_details['posts'] = linked_in.loop.run_until_complete(
-            linked_in.get_company_posts(company_details)
-        )
+        linked_in = LinkedInExtented(**get_li_creds(), refresh_cookies=False)
 
-    if args.employees:
-        final_company_details['employees'] = []
+        if args.stream:
+            writer = NDJSONWriter(args.output)
 
-        func_list = linked_in.loop.run_until_complete(
-            linked_in.get_employees_functions(company_details)
-        )
+            async def stream_batch():
+                companies = await resolve_companies(linked_in, entries, args.concurrency)
+                await stream_companies(linked_in, companies, sections, writer, args.concurrency)
+
+            try:
+                linked_in.loop.run_until_complete(stream_batch())
+            finally:
+                writer.close()
+            sys.exit()
+
+        async def scrape_batch():
+            companies = await resolve_companies(linked_in, entries, args.concurrency)
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def collect(company_details):
+                async with semaphore:
+                    return await collect_company(linked_in, company_details, **sections)
 
-        for func in func_list:
-            final_company_details['employees'].append(
-                linked_in.loop.run_until_complete(func())
+            return await asyncio.gather(*[collect(i) for i in companies])
+
+        sys.stdout.write(json.dumps(linked_in.loop.run_until_complete(scrape_batch())))
+        sys.exit()
+
+    linked_in = LinkedInExtented(**get_li_creds(), refresh_cookies=False)
+
+    company_details = linked_in.get_company(
+        company_username=args.company_name, company_link=args.company_link
+    )
+
+    if args.stream:
+        writer = NDJSONWriter(args.output)
+        try:
+            linked_in.loop.run_until_complete(
+                stream_companies(linked_in, [company_details], sections, writer, 1)
             )
+        finally:
+            writer.close()
+        sys.exit()
 
-    if args.events:
-        final_company_details['events'] = linked_in.loop.run_until_complete(
-            linked_in.get_company_events(company_details)
-        )
+    final_company_details = linked_in.loop.run_until_complete(
+        collect_company(linked_in, company_details, **sections)
+    )
 
     sys.stdout.write(json.dumps(final_company_details))
@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import JSONB
 
 db = SQLAlchemy()
 
@@ -7,6 +8,8 @@ employment_record = db.Table(
     'linkedin_employment_records',
     db.Column('company_id', db.BigInteger(), db.ForeignKey('linkedin_companies_base_details.internal_id')),
     db.Column('employee_id' ,db.Text(), db.ForeignKey('linkedin_employees_details.public_id')),
+    db.UniqueConstraint('company_id', 'employee_id', name='uq_employment_record'),
+    db.Index('ix_linkedin_employment_records_employee_id', 'employee_id'),
 )
 
 
@@ -16,16 +19,23 @@ class CompanyBaseDetails(db.Model):
     internal_id = db.Column(db.BigInteger(), primary_key=True)
     link = db.Column(db.Text())
     website = db.Column(db.Text())
-    address = db.Column(db.JSON())
+    address = db.Column(JSONB())
     display_name = db.Column(db.Text())
     universal_name = db.Column(db.Text())
-    employee_count = db.Column(db.JSON())
+    employee_count = db.Column(JSONB())
     specialities = db.Column(db.ARRAY(db.Text()))
     followers_count = db.Column(db.BigInteger())
     tagline = db.Column(db.Text())
     description = db.Column(db.Text())
     founded_on = db.Column(db.Integer())
     industry = db.Column(db.ARRAY(db.Text()))
+    scraped_at = db.Column(db.DateTime())
+
+    __table_args__ = (
+        db.Index(
+            'ix_linkedin_companies_base_details_lower_universal_name', db.func.lower(universal_name)
+        ),
+    )
 
     jobs = db.relationship('JobDetails', backref='company')
     events = db.relationship('EventDetails', backref='company')
@@ -45,9 +55,10 @@ class JobDetails(db.Model):
     location = db.Column(db.Text())
     listed_at = db.Column(db.DateTime())
     expire_at = db.Column(db.DateTime())
+    content_hash = db.Column(db.Text())
 
     company_id = db.Column(
-        db.BigInteger(), db.ForeignKey('linkedin_companies_base_details.internal_id')
+        db.BigInteger(), db.ForeignKey('linkedin_companies_base_details.internal_id'), index=True
     )
 
     def __repr__(self):
@@ -63,9 +74,10 @@ class EventDetails(db.Model):
     description = db.Column(db.Text())
     display_time = db.Column(db.Text())
     attendee_count = db.Column(db.BigInteger())
+    content_hash = db.Column(db.Text())
 
     company_id = db.Column(
-        db.BigInteger(), db.ForeignKey('linkedin_companies_base_details.internal_id')
+        db.BigInteger(), db.ForeignKey('linkedin_companies_base_details.internal_id'), index=True
     )
 
     def __repr__(self):
@@ -76,11 +88,12 @@ class PostDetails(db.Model):
     __tablename__ = "linkedin_posts_details"
 
     link = db.Column(db.Text(), primary_key=True)
-    content = db.Column(db.JSON())
-    commentary = db.Column(db.JSON())
+    content = db.Column(JSONB())
+    commentary = db.Column(JSONB())
+    content_hash = db.Column(db.Text())
 
     company_id = db.Column(
-        db.BigInteger(), db.ForeignKey('linkedin_companies_base_details.internal_id')
+        db.BigInteger(), db.ForeignKey('linkedin_companies_base_details.internal_id'), index=True
     )
 
     def __repr__(self):
@@ -89,6 +102,13 @@ class PostDetails(db.Model):
 
 class EmployeeDetails(db.Model):
     __tablename__ = "linkedin_employees_details"
+    __table_args__ = (
+        db.Index(
+            'ix_linkedin_employees_details_experience', 'experience',
+            postgresql_using='gin', postgresql_ops={'experience': 'jsonb_path_ops'}
+        ),
+        db.Index('ix_linkedin_employees_details_skills', 'skills', postgresql_using='gin'),
+    )
 
     public_id = db.Column(db.Text(), primary_key=True)
     firstName = db.Column(db.Text())
@@ -100,22 +120,40 @@ class EmployeeDetails(db.Model):
     student = db.Column(db.Boolean())
     geoCountryName = db.Column(db.Text())
     geoLocationName = db.Column(db.Text())
-    experience = db.Column(db.ARRAY(db.JSON()))
-    education = db.Column(db.ARRAY(db.JSON()))
-    languages = db.Column(db.ARRAY(db.JSON()))
-    publications = db.Column(db.ARRAY(db.JSON()))
-    certifications = db.Column(db.ARRAY(db.JSON()))
-    volunteer = db.Column(db.ARRAY(db.JSON()))
-    honors = db.Column(db.ARRAY(db.JSON()))
+    experience = db.Column(JSONB())
+    education = db.Column(JSONB())
+    languages = db.Column(JSONB())
+    publications = db.Column(JSONB())
+    certifications = db.Column(JSONB())
+    volunteer = db.Column(JSONB())
+    honors = db.Column(JSONB())
     email_address = db.Column(db.Text())
-    websites = db.Column(db.ARRAY(db.JSON()))
-    twitter = db.Column(db.ARRAY(db.JSON()))
-    birthdate = db.Column(db.JSON())
-    phone_numbers = db.Column(db.ARRAY(db.JSON()))
+    websites = db.Column(JSONB())
+    twitter = db.Column(JSONB())
+    birthdate = db.Column(JSONB())
+    phone_numbers = db.Column(JSONB())
     followable = db.Column(db.Boolean())
     followersCount = db.Column(db.BigInteger())
     connectionsCount = db.Column(db.BigInteger())
     skills = db.Column(db.ARRAY(db.Text()))
+    content_hash = db.Column(db.Text())
+    scraped_at = db.Column(db.DateTime())
 
     def __repr__(self):
         return f"EmployeeDetails <{self.firstName} {self.lastName}>"
+
+
+class ScrapeState(db.Model):
+    __tablename__ = "linkedin_scrape_state"
+
+    company_id = db.Column(
+        db.BigInteger(), db.ForeignKey('linkedin_companies_base_details.internal_id'),
+        primary_key=True
+    )
+    section = db.Column(db.Text(), primary_key=True)
+    last_run_at = db.Column(db.DateTime())
+    newest_listed_at = db.Column(db.DateTime())
+    newest_link = db.Column(db.Text())
+
+    def __repr__(self):
+        return f"ScrapeState <{self.company_id}: {self.section}>"
@@ -0,0 +1,73 @@
+import os
+from datetime import datetime, timedelta
+
+import redis
+
+import models
+
+
+class ProfileCache:
+    """
+    Freshness check for employee profiles shared by every company: a profile
+    scraped within `ttl` seconds, as marked in redis or by the `scraped_at`
+    of its `linkedin_employees_details` row, is not fetched again.
+    """
+
+    prefix = "li:profile:"
+
+    def __init__(self, redis_url, ttl=None):
+        self.redis = redis.Redis.from_url(redis_url)
+        self.ttl = ttl or int(os.getenv("PROFILE_CACHE_TTL", 7 * 24 * 60 * 60))
+
+    @property
+    def stats_key(self):
+        return f"{self.prefix}stats"
+
+    def fresh(self, public_ids):
+        """
+        The subset of `public_ids` that does not need fetching.
+        """
+
+        public_ids = list(public_ids)
+        if not public_ids:
+            return set()
+
+        pipeline = self.redis.pipeline()
+        for public_id in public_ids:
+            pipeline.exists(f"{self.prefix}{public_id}")
+        hits = {i for i, cached in zip(public_ids, pipeline.execute()) if cached}
+
+        misses = [i for i in public_ids if i not in hits]
+        if misses:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+            rows = models.EmployeeDetails.query.with_entities(
+                models.EmployeeDetails.public_id, models.EmployeeDetails.scraped_at
+            ).filter(
+                models.EmployeeDetails.public_id.in_(misses),
+                models.EmployeeDetails.scraped_at > cutoff,
+            ).all()
+
+            pipeline = self.redis.pipeline()
+            for public_id, scraped_at in rows:
+                hits.add(public_id)
+                pipeline.set(
+                    f"{self.prefix}{public_id}", 1, ex=max(int((scraped_at - cutoff).total_seconds()), 1)
+                )
+            pipeline.execute()
+
+        self.redis.pipeline().hincrby(self.stats_key, "hits", len(hits)).hincrby(
+            self.stats_key, "misses", len(public_ids) - len(hits)
+        ).execute()
+
+        return hits
+
+    def mark(self, public_ids):
+        pipeline = self.redis.pipeline()
+        for public_id in public_ids:
+            pipeline.set(f"{self.prefix}{public_id}", 1, ex=self.ttl)
+        pipeline.execute()
+
+    def stats(self):
+        stats = {k.decode(): int(v) for k, v in self.redis.hgetall(self.stats_key).items()}
+        hits, misses = stats.get("hits", 0), stats.get("misses", 0)
+        return {"hits": hits, "misses": misses, "hit_ratio": hits / (hits + misses) if hits + misses else None}
@@ -0,0 +1,104 @@
+import os
+from time import time
+from uuid import uuid4
+
+
+JOB_TTL = int(os.getenv("JOB_TTL", 7 * 24 * 60 * 60))
+
+
+class JobProgress:
+    """
+    Progress of one `/scrape` job, kept in a redis hash so the api and
+    every celery worker see the same counters.
+    Section fields are flattened as `<section>.<field>`.
+    """
+
+    prefix = "li:job:"
+
+    def __init__(self, redis_client, job_id):
+        self.redis = redis_client
+        self.job_id = job_id
+        self.key = f"{self.prefix}{job_id}"
+
+    @classmethod
+    def create(cls, redis_client, sections, **details):
+        progress = cls(redis_client, uuid4().hex)
+        progress.update(
+            status="pending", created_at=time(), sections=",".join(sections),
+            **{k: v for k, v in details.items() if v is not None}
+        )
+        return progress
+
+    def update(self, **fields):
+        self.redis.pipeline().hset(self.key, mapping=fields).expire(self.key, JOB_TTL).execute()
+
+    def start(self, section):
+        self.update(**{f"{section}.status": "running", f"{section}.started_at": time()})
+
+    def finish(self, section, error=None):
+        self.update(**{
+            f"{section}.status": "failed" if error else "done",
+            f"{section}.finished_at": time(),
+            **({f"{section}.error": repr(error)} if error else {}),
+        })
+        # left behind by a retried try
+        if not error:
+            self.redis.hdel(self.key, f"{section}.error")
+
+    def attach(self, section, job_id):
+        """
+        Hand `section` over to another job already scraping it.
+        """
+
+        self.update(**{f"{section}.status": "attached", f"{section}.attached_to": job_id})
+
+    def settle(self):
+        """
+        Close the job once every one of its sections is done, failed or attached.
+        """
+
+        raw = {k.decode(): v.decode() for k, v in self.redis.hgetall(self.key).items()}
+        statuses = [
+            raw.get(f"{section}.status", "pending")
+            for section in raw.get("sections", "").split(",") if section
+        ]
+        if all(status in ("done", "failed", "attached") for status in statuses):
+            self.update(status="failed" if "failed" in statuses else "done", finished_at=time())
+
+    def add(self, section, **counts):
+        """
+        Increment the `fetched`, `persisted` or `cached` counts of `section`.
+        """
+
+        pipeline = self.redis.pipeline()
+        for field, count in counts.items():
+            if count:
+                pipeline.hincrby(self.key, f"{section}.{field}", count)
+        pipeline.execute()
+
+    def get(self):
+        raw = {k.decode(): v.decode() for k, v in self.redis.hgetall(self.key).items()}
+        if not raw:
+            return None
+
+        job = {"job_id": self.job_id, "sections": {}}
+        sections = [i for i in raw.pop("sections", "").split(",") if i]
+
+        for section in sections:
+            started_at = raw.pop(f"{section}.started_at", None)
+            finished_at = raw.pop(f"{section}.finished_at", None)
+            job["sections"][section] = {
+                "status": raw.pop(f"{section}.status", "pending"),
+                "fetched": int(raw.pop(f"{section}.fetched", 0)),
+                "persisted": int(raw.pop(f"{section}.persisted", 0)),
+                "cached": int(raw.pop(f"{section}.cached", 0)),
+                "elapsed": round(
+                    float(finished_at or time()) - float(started_at), 3
+                ) if started_at else None,
+            }
+            for field in ("error", "attached_to"):
+                if f"{section}.{field}" in raw:
+                    job["sections"][section][field] = raw.pop(f"{section}.{field}")
+
+        job.update(raw)
+        return job
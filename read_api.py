@@ -0,0 +1,198 @@
+import os
+import json
+from datetime import datetime
+
+from flask import Blueprint, Response, request, stream_with_context
+from sqlalchemy import select, func, or_, types
+
+import models
+from models import db
+from response_cache import response_cache
+
+
+READ_PAGE_SIZE = int(os.getenv("READ_PAGE_SIZE", 100))
+READ_MAX_PAGE_SIZE = int(os.getenv("READ_MAX_PAGE_SIZE", 1000))
+# rows fetched per round trip from the server-side cursor of a streamed response
+READ_STREAM_BATCH = int(os.getenv("READ_STREAM_BATCH", 500))
+
+# section of `/companies/<id>/<section>` to its model
+SECTION_MODELS = {
+    "jobs": models.JobDetails,
+    "posts": models.PostDetails,
+    "events": models.EventDetails,
+    "employees": models.EmployeeDetails,
+}
+
+read_api = Blueprint("read_api", __name__)
+
+
+class BadRequest(Exception):
+    pass
+
+
+def to_json_value(value):
+    # same shape as `get_company` and `company_to_dict`: timestamps as strings
+    return str(value) if isinstance(value, datetime) else value
+
+
+def projection(table):
+    """
+    Columns of `table` named in `?fields=`, all of them by default.
+    The primary key is always included as it is the page cursor.
+    """
+
+    key = table.primary_key.columns.values()[0]
+    fields = [i for i in request.args.get("fields", "").split(",") if i]
+    if not fields:
+        return list(table.columns), key
+
+    unknown = [i for i in fields if i not in table.c]
+    if unknown:
+        raise BadRequest(f"Unknown `fields`: {', '.join(unknown)}")
+
+    return [key] + [table.c[i] for i in dict.fromkeys(fields) if i != key.name], key
+
+
+def keyset(stmt, key):
+    """
+    Order `stmt` by `key` and start it after the `?after=` cursor.
+    """
+
+    after = request.args.get("after")
+    if after is not None:
+        if isinstance(key.type, types.Integer):
+            try:
+                after = int(after)
+            except ValueError:
+                raise BadRequest("`after` must be an integer")
+        stmt = stmt.where(key > after)
+    return stmt.order_by(key)
+
+
+def page_size():
+    try:
+        limit = int(request.args.get("limit", READ_PAGE_SIZE))
+    except ValueError:
+        raise BadRequest("`limit` must be an integer")
+    if limit < 1:
+        raise BadRequest("`limit` must be positive")
+    return min(limit, READ_MAX_PAGE_SIZE)
+
+
+def wants_ndjson():
+    if request.args.get("format") == "ndjson":
+        return True
+    return request.accept_mimetypes.best_match(
+        ["application/json", "application/x-ndjson"]
+    ) == "application/x-ndjson"
+
+
+def respond(stmt, columns, key):
+    """
+    A page of `{"data": [...], "next": <cursor>}`, or with `?format=ndjson`
+    every row from the cursor on (or `?limit=` of them) streamed one per line
+    off a server-side cursor.
+    """
+
+    stmt = keyset(stmt, key)
+    names = [column.name for column in columns]
+
+    if wants_ndjson():
+        if "limit" in request.args:
+            stmt = stmt.limit(page_size())
+
+        def generate():
+            result = db.session.execute(
+                stmt.execution_options(stream_results=True)
+            ).yield_per(READ_STREAM_BATCH)
+            try:
+                for row in result:
+                    yield json.dumps(
+                        {name: to_json_value(value) for name, value in zip(names, row)}, default=str
+                    ) + "\n"
+            finally:
+                result.close()
+                db.session.rollback()
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    limit = page_size()
+    rows = [
+        {name: to_json_value(value) for name, value in zip(names, row)}
+        for row in db.session.execute(stmt.limit(limit + 1))
+    ]
+
+    return {
+        "data": rows[:limit],
+        "next": rows[limit - 1][key.name] if len(rows) > limit else None,
+    }
+
+
+def listing_version():
+    count, newest = db.session.execute(
+        select(func.count(), func.max(models.CompanyBaseDetails.scraped_at))
+    ).one()
+    return f"{count}:{newest}:{response_cache.version()}"
+
+
+def company_version(company_id, section=None):
+    company = db.session.execute(
+        select(models.CompanyBaseDetails.scraped_at).where(
+            models.CompanyBaseDetails.internal_id == company_id
+        )
+    ).first()
+    if company is None:
+        return None
+    return f"{company.scraped_at}:{response_cache.version(company_id)}"
+
+
+@read_api.errorhandler(BadRequest)
+def bad_request(e):
+    return ({"error": str(e)}, 400)
+
+
+@read_api.route("/companies")
+@response_cache.cached(listing_version)
+def companies():
+    table = models.CompanyBaseDetails.__table__
+    columns, key = projection(table)
+    stmt = select(*columns)
+
+    search = request.args.get("search")
+    if search:
+        search = search.lower()
+        stmt = stmt.where(or_(
+            func.lower(table.c.universal_name).contains(search, autoescape=True),
+            func.lower(table.c.display_name).contains(search, autoescape=True),
+        ))
+
+    return respond(stmt, columns, key)
+
+
+@read_api.route("/companies/<int:company_id>/<section>")
+@response_cache.cached(company_version)
+def company_section(company_id, section):
+    if section not in SECTION_MODELS:
+        return ({"error": f"Unknown section, choose from {', '.join(SECTION_MODELS)}"}, 404)
+
+    company = db.session.execute(
+        select(models.CompanyBaseDetails.internal_id).where(
+            models.CompanyBaseDetails.internal_id == company_id
+        )
+    ).first()
+    if company is None:
+        return ({"error": "Unknown company"}, 404)
+
+    table = SECTION_MODELS[section].__table__
+    columns, key = projection(table)
+    stmt = select(*columns)
+
+    if section == "employees":
+        record = models.employment_record
+        stmt = stmt.join(record, record.c.employee_id == table.c.public_id).where(
+            record.c.company_id == company_id
+        )
+    else:
+        stmt = stmt.where(table.c.company_id == company_id)
+
+    return respond(stmt, columns, key)
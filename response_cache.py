@@ -0,0 +1,134 @@
+import os
+import gzip
+import json
+from hashlib import sha1
+from functools import wraps
+
+import redis
+from flask import Response, make_response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class ResponseCache:
+    """
+    Conditional and cached responses for read views.
+
+    A view decorated with `cached(version_of)` gets a weak ETag built from its
+    url, `Accept` header and `version_of(**view_args)`, answers a matching
+    `If-None-Match` with 304 before running, and keeps its body in redis
+    under that ETag. Bumping a company's version (`invalidate`) is enough to
+    retire every cached response about it.
+    """
+
+    prefix = "li:response:"
+
+    def __init__(self, app=None, redis_url=None):
+        self.redis = None
+        if app is not None:
+            self.init_app(app, redis_url)
+
+    def init_app(self, app, redis_url):
+        self.redis = redis.Redis.from_url(redis_url)
+        self.ttl = int(os.getenv("RESPONSE_CACHE_TTL", 300))
+        self.max_size = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 1024 * 1024))
+        self.compress_size = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", 1024))
+        app.extensions["response_cache"] = self
+
+    def version_key(self, company_id=None):
+        return f"{self.prefix}version:{company_id if company_id is not None else 'companies'}"
+
+    def version(self, company_id=None):
+        """
+        Version of the data of `company_id`, or of the company listing.
+        """
+
+        return int(self.redis.get(self.version_key(company_id)) or 0)
+
+    def invalidate(self, company_ids=(), listing=False):
+        pipeline = self.redis.pipeline()
+        for company_id in set(company_ids):
+            pipeline.incr(self.version_key(company_id))
+        if listing:
+            pipeline.incr(self.version_key())
+        pipeline.execute()
+
+    def compress(self, response):
+        if (
+            response.status_code != 200 or response.is_streamed
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        data = response.get_data()
+        if len(data) < self.compress_size:
+            return response
+
+        response.vary.add("Accept-Encoding")
+        if brotli is not None and request.accept_encodings["br"]:
+            data, encoding = brotli.compress(data), "br"
+        elif request.accept_encodings["gzip"]:
+            data, encoding = gzip.compress(data), "gzip"
+        else:
+            return response
+
+        response.set_data(data)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def cached(self, version_of=None):
+        """
+        Without `version_of` the ETag is a hash of the body, which saves
+        bandwidth but not the work of building it.
+        A `version_of` returning None (e.g. unknown company) skips caching.
+        """
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                version = version_of(*args, **kwargs) if version_of else None
+
+                if version is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code == 200 and not response.is_streamed:
+                        response.add_etag(weak=True)
+                        response = response.make_conditional(request)
+                    return self.compress(response)
+
+                etag = sha1(json.dumps(
+                    [request.full_path, request.headers.get("Accept", ""), version]
+                ).encode()).hexdigest()
+
+                if request.if_none_match.contains_weak(etag):
+                    response = Response(status=304)
+                    response.set_etag(etag, weak=True)
+                    return response
+
+                cached = self.redis.get(f"{self.prefix}{etag}")
+                if cached is not None:
+                    mimetype, body = cached.split(b"\n", 1)
+                    response = Response(body, mimetype=mimetype.decode())
+                    response.headers["X-Cache"] = "HIT"
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    if not response.is_streamed and len(response.get_data()) <= self.max_size:
+                        self.redis.set(
+                            f"{self.prefix}{etag}",
+                            response.mimetype.encode() + b"\n" + response.get_data(), ex=self.ttl
+                        )
+                    response.headers["X-Cache"] = "MISS"
+
+                response.set_etag(etag, weak=True)
+                response.vary.add("Accept")
+                return self.compress(response)
+
+            return wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
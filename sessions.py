@@ -0,0 +1,80 @@
+import threading
+from functools import partial
+from time import time
+
+from linkedin import LinkedInExtented
+
+
+class SessionPool:
+    """
+    Process wide pool of logged in `LinkedInExtented` clients, one per account.
+    A client is reused until its cookies expire, 401/403 are refreshed by the client itself.
+    Clients whose account fails to log in or gets cooled down are dropped.
+    """
+
+    def __init__(self, client_cls=LinkedInExtented):
+        self.client_cls = client_cls
+        self.clients = {}
+        self.lock = threading.Lock()
+        self.account_locks = {}
+        self.counters = {}
+
+    def _count(self, username, key):
+        self.counters.setdefault(username, {"logins": 0, "reuses": 0, "expired": 0, "invalidated": 0})[key] += 1
+
+    def get(self, username, password, **kwargs):
+        with self.lock:
+            account_lock = self.account_locks.setdefault(username, threading.Lock())
+
+        # login happens outside the pool lock, so other accounts are not blocked
+        with account_lock:
+            client = self.clients.get(username)
+
+            if client is not None and client.session_expired:
+                self._count(username, "expired")
+                client = None
+
+            if client is None:
+                try:
+                    client = self.client_cls(username, password, **kwargs)
+                except Exception:
+                    self.invalidate(username)
+                    raise
+                client.logged_in_at = time()
+                client.on_discard = partial(self.invalidate, username, client)
+                self.clients[username] = client
+                self._count(username, "logins")
+            else:
+                self._count(username, "reuses")
+
+            return client
+
+    async def aclose(self):
+        with self.lock:
+            clients = list(self.clients.values())
+        for client in clients:
+            await client.transport.aclose()
+
+    def invalidate(self, username, client=None):
+        """
+        Drop the client of `username`, only if it still is `client` when given.
+        """
+
+        with self.lock:
+            if username in self.clients and client in (None, self.clients[username]):
+                self.clients.pop(username)
+                self._count(username, "invalidated")
+
+    def stats(self):
+        return {
+            username: {
+                **counters,
+                "refreshes": getattr(self.clients.get(username), "refresh_count", 0),
+                "logged_in_at": getattr(self.clients.get(username), "logged_in_at", None),
+                "active": username in self.clients,
+                **({"limiter": self.clients[username].limiter.stats()} if username in self.clients else {}),
+            } for username, counters in self.counters.items()
+        }
+
+
+session_pool = SessionPool()
@@ -0,0 +1,130 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
+
+import redis
+
+
+# the job already scraping (lease) or that just scraped (fresh) a section,
+# else lease it to ARGV[1]
+CLAIM_SECTION = """
+if ARGV[3] ~= '1' then
+    local fresh = redis.call('GET', KEYS[1])
+    if fresh then
+        return fresh
+    end
+end
+local owner = redis.call('GET', KEYS[2])
+if owner then
+    return owner
+end
+redis.call('SET', KEYS[2], ARGV[1], 'EX', ARGV[2])
+return ARGV[1]
+"""
+
+RELEASE_SECTION = """
+if redis.call('GET', KEYS[2]) ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[2])
+if ARGV[2] == '1' then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+end
+return 1
+"""
+
+RENEW_SECTION = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    One job at a time per company and section: a job leases a section
+    before scraping it, others asking for it are attached to that job.
+    A finished section stays `fresh` for `freshness` seconds, during which
+    it is not scraped again either.
+    """
+
+    prefix = "li:flight:"
+
+    def __init__(self, redis_url, ttl=None, freshness=None):
+        self.redis = redis.Redis.from_url(redis_url)
+        self.ttl = ttl or int(os.getenv("SCRAPE_LEASE_TTL", 60 * 60))
+        self.freshness = freshness or int(os.getenv("SCRAPE_FRESHNESS", 60 * 60))
+        self.claim_section = self.redis.register_script(CLAIM_SECTION)
+        self.release_section = self.redis.register_script(RELEASE_SECTION)
+        self.renew_section = self.redis.register_script(RENEW_SECTION)
+
+    def _keys(self, company_id, section):
+        return [
+            f"{self.prefix}fresh:{company_id}:{section}",
+            f"{self.prefix}lease:{company_id}:{section}",
+        ]
+
+    def claim(self, company_id, sections, job_id, force_refresh=False):
+        """
+        Lease `sections` of `company_id` to `job_id`.
+
+        :return: dict of the sections taken by another job to that job's id,
+            `job_id` holds every other section
+        """
+
+        attached = {}
+        for section in sections:
+            owner = self.claim_section(
+                keys=self._keys(company_id, section),
+                args=[job_id, self.ttl, int(force_refresh)]
+            ).decode()
+            if owner != job_id:
+                attached[section] = owner
+        return attached
+
+    def peek(self, company_id, sections, force_refresh=False):
+        """
+        Same as `claim` without leasing anything, sections that are free are left out.
+        """
+
+        pipeline = self.redis.pipeline()
+        for section in sections:
+            pipeline.mget(self._keys(company_id, section))
+
+        taken = {}
+        for section, (fresh, owner) in zip(sections, pipeline.execute()):
+            owner = owner if force_refresh else fresh or owner
+            if owner:
+                taken[section] = owner.decode()
+        return taken
+
+    def renew(self, company_id, section, job_id):
+        self.renew_section(keys=self._keys(company_id, section)[1:], args=[job_id, self.ttl])
+
+    @asynccontextmanager
+    async def kept(self, company_id, section, job_id):
+        """
+        Renew the lease of `job_id` every third of `ttl` while the body runs,
+        so that a long scrape does not outlive it.
+        """
+
+        async def keep():
+            while True:
+                self.renew(company_id, section, job_id)
+                await asyncio.sleep(self.ttl / 3)
+
+        keeper = asyncio.ensure_future(keep())
+        try:
+            yield
+        finally:
+            keeper.cancel()
+
+    def release(self, company_id, section, job_id, done=True):
+        """
+        Give up the lease of `job_id`, marking the section fresh if it is `done`.
+        """
+
+        self.release_section(
+            keys=self._keys(company_id, section), args=[job_id, int(done), self.freshness]
+        )
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import threading
+from random import uniform
+from time import monotonic, sleep, time
+from email.utils import parsedate_to_datetime
+
+
+# 999 is what LinkedIn answers to suspected scraping
+THROTTLED_STATUS_CODES = (429, 999)
+
+
+def is_throttled(status_code):
+    return status_code in THROTTLED_STATUS_CODES or status_code >= 500
+
+
+def parse_retry_after(value):
+    """
+    Seconds asked for by a `Retry-After` header, given in seconds or as a date.
+    """
+
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return int(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    """
+    Per account pacing of Voyager requests, shared by the blocking `_fetch`
+    and the async transport.
+
+    Successful responses raise the rate additively and widen the concurrency
+    up to `max_rate` / `max_concurrency`, a throttled one (429, 999, 5xx)
+    halves both and blocks every request for an exponential, jittered backoff,
+    or for `Retry-After` when LinkedIn sends one.
+    """
+
+    poll_interval = 0.05
+
+    def __init__(
+        self, rate, max_rate=None, min_rate=None, concurrency=1, max_concurrency=None,
+        backoff=2, max_backoff=300
+    ):
+        self.rate = float(rate)
+        self.max_rate = float(max_rate or rate)
+        self.min_rate = float(min_rate or min(rate, 0.1))
+        self.concurrency = float(concurrency)
+        self.max_concurrency = float(max_concurrency or concurrency)
+        self.backoff, self.max_backoff = backoff, max_backoff
+
+        self.lock = threading.Lock()
+        self.next_at, self.blocked_until = monotonic(), 0
+        self.in_flight, self.failures = 0, 0
+
+    def _reserve(self):
+        """
+        Take a concurrency slot and return how long to wait before sending,
+        None when every slot is taken.
+        """
+
+        with self.lock:
+            if self.in_flight >= int(self.concurrency):
+                return None
+
+            now = monotonic()
+            start = max(now, self.next_at, self.blocked_until)
+            self.next_at = start + 1 / self.rate
+            self.in_flight += 1
+            return start - now
+
+    def wait(self):
+        wait = self._reserve()
+        while wait is None:
+            sleep(self.poll_interval)
+            wait = self._reserve()
+        if wait > 0:
+            sleep(wait)
+
+    async def acquire(self):
+        wait = self._reserve()
+        while wait is None:
+            await asyncio.sleep(self.poll_interval)
+            wait = self._reserve()
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.release()
+                raise
+
+    def release(self, status_code=None, retry_after=None):
+        """
+        Free the slot taken by `wait`/`acquire` and adapt to `status_code`,
+        None meaning the request never got a response.
+
+        :return: seconds every request is now held back for, 0 if not throttled
+        """
+
+        with self.lock:
+            self.in_flight -= 1
+
+            if status_code is None or not is_throttled(status_code):
+                if status_code is not None and status_code < 400:
+                    self.failures = 0
+                    self.rate = min(self.max_rate, self.rate + self.min_rate)
+                    self.concurrency = min(
+                        self.max_concurrency, self.concurrency + 1 / self.concurrency
+                    )
+                return 0
+
+            self.failures += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.concurrency = max(1.0, self.concurrency / 2)
+
+            if retry_after is None:
+                retry_after = min(
+                    self.max_backoff, self.backoff * 2 ** (self.failures - 1)
+                ) * uniform(0.5, 1)
+
+            self.blocked_until = max(self.blocked_until, monotonic() + retry_after)
+            return retry_after
+
+    def stats(self):
+        return {
+            "rate": round(self.rate, 3),
+            "concurrency": int(self.concurrency),
+            "in_flight": self.in_flight,
+            "failures": self.failures,
+            "blocked_for": round(max(self.blocked_until - monotonic(), 0), 3),
+        }
+
+
+class Pacer:
+    """
+    Retry policy of the requests of one account, shared by the blocking
+    `_fetch` and the async transport.
+
+    Every attempt takes a request from the account's budget through
+    `scheduler`, when there is one, and a slot of `limiter`. A throttled
+    response is retried up to `max_retries` times, the limiter holding it
+    back in between, then `on_exhausted(retry_after)` is called, e.g. to
+    cool the account down for every process.
+    """
+
+    def __init__(
+        self, limiter, max_retries, scheduler=None, username=None, on_exhausted=None, logger=None
+    ):
+        self.limiter, self.max_retries = limiter, max_retries
+        self.scheduler, self.username = scheduler, username
+        self.on_exhausted = on_exhausted
+        self.logger = logger or logging.getLogger(__name__)
+
+    def _settle(self, res):
+        """
+        Release the slot of an attempt, True if it is to be retried.
+        """
+
+        self.limiter.release(res.status_code, parse_retry_after(res.headers.get("Retry-After")))
+        if not is_throttled(res.status_code):
+            return False
+        self.logger.info(f"request failed: {res.status_code}, backing off {self.username}")
+        return True
+
+    def _give_up(self, res):
+        self.logger.info(f"request failed: {res.status_code}, cooling down {self.username}")
+        if self.on_exhausted is not None:
+            self.on_exhausted(parse_retry_after(res.headers.get("Retry-After")))
+        return res
+
+    def send(self, request):
+        """
+        Call `request()`, blocking and returning a response, under this policy.
+        """
+
+        for _ in range(self.max_retries + 1):
+            if self.scheduler is not None:
+                self.scheduler.reserve(self.username)
+            self.limiter.wait()
+            try:
+                res = request()
+            except BaseException:
+                self.limiter.release()
+                raise
+            if not self._settle(res):
+                return res
+
+        return self._give_up(res)
+
+    async def asend(self, request):
+        """
+        Await `request()` under this policy, waiting never holds a thread.
+        """
+
+        for _ in range(self.max_retries + 1):
+            if self.scheduler is not None:
+                await self.scheduler.areserve(self.username)
+            await self.limiter.acquire()
+            try:
+                res = await request()
+            except BaseException:
+                self.limiter.release()
+                raise
+            if not self._settle(res):
+                return res
+
+        return self._give_up(res)
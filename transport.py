@@ -0,0 +1,124 @@
+import os
+import types
+from copy import copy, deepcopy
+
+import httpx
+from linkedin_api.client import Client
+
+
+class PendingRequest(BaseException):
+    """
+    Raised from inside a replayed `linkedin_api` method when it asks for a
+    response that has not been fetched yet. BaseException so that no
+    `except Exception` in the parsing code can swallow it.
+    """
+
+    def __init__(self, uri, base_request, kwargs):
+        self.uri, self.base_request, self.kwargs = uri, base_request, kwargs
+
+
+class AsyncTransport:
+    """
+    Voyager GET requests over a pooled, keep-alive (optionally HTTP/2)
+    `httpx.AsyncClient`, sharing the cookie jar and csrf-token of the
+    `requests` session of `linked_in`.
+    """
+
+    http2 = os.getenv("LI_HTTP2", "0") == "1"
+    max_connections = int(os.getenv("LI_MAX_CONNECTIONS", 100))
+
+    def __init__(self, linked_in):
+        self.linked_in = linked_in
+        self._client, self._jar = None, None
+
+    @property
+    def client(self):
+        session = self.linked_in.client.session
+
+        if self._client is None:
+            try:
+                import h2  # noqa: F401
+                http2 = self.http2
+            except ImportError:
+                http2 = False
+
+            self._client = httpx.AsyncClient(
+                headers=Client.REQUEST_HEADERS,
+                proxies=session.proxies or None,
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=30,
+            )
+
+        # a re-login swaps the whole jar of the session
+        if self._jar is not session.cookies:
+            self._jar = session.cookies
+            self._client.cookies = self._jar
+
+        return self._client
+
+    async def _paced_get(self, uri, base_request=False, headers={}, **kwargs):
+        linked_in = self.linked_in
+        base_url = Client.API_BASE_URL if not base_request else Client.LINKEDIN_BASE_URL
+
+        return await linked_in.pacer.asend(lambda: self.client.get(
+            f"{base_url}{uri}", headers={**headers, 'csrf-token': linked_in.csrf_token}, **kwargs
+        ))
+
+    async def fetch(self, uri, evade=None, base_request=False, headers={}, **kwargs):
+        """
+        async counterpart of `LinkedInExtented._fetch`, `evade` is ignored
+        as pacing is left to the limiter.
+        """
+
+        linked_in = self.linked_in
+        csrf_token = linked_in.csrf_token
+
+        res = await self._paced_get(uri, base_request, headers, **kwargs)
+
+        if res.status_code in (401, 403):
+            linked_in.logger.info(f"request failed: {res.status_code}, refreshing session")
+            await linked_in.asyncronize(linked_in.refresh_session, csrf_token)
+            res = await self._paced_get(uri, base_request, headers, **kwargs)
+
+        return res
+
+    async def replay(self, method, *args, **kwargs):
+        """
+        Run a blocking `linkedin_api` method (bound to `linked_in`) on the
+        event loop: every `_fetch` it makes is performed through `fetch`
+        and fed back to the method, which is re-run until it needs no more
+        requests. The parsing stays the library's own.
+        """
+
+        responses = []
+
+        while True:
+            served = iter(responses)
+
+            def replayed_fetch(uri, evade=None, base_request=False, **fetch_kwargs):
+                response = next(served, None)
+                if response is None:
+                    raise PendingRequest(uri, base_request, fetch_kwargs)
+                return response
+
+            replayed = copy(self.linked_in)
+            replayed._fetch = replayed_fetch
+
+            try:
+                # arguments are copied as some methods mutate them, e.g. `results=[]`
+                return types.MethodType(method.__func__, replayed)(
+                    *deepcopy(args), **deepcopy(kwargs)
+                )
+            except PendingRequest as request:
+                responses.append(await self.fetch(
+                    request.uri, base_request=request.base_request, **request.kwargs
+                ))
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
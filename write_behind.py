@@ -0,0 +1,82 @@
+import os
+import asyncio
+from time import monotonic
+
+
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", 500))
+WRITE_INTERVAL = float(os.getenv("WRITE_INTERVAL", 2))
+WRITE_MAX_PENDING = int(os.getenv("WRITE_MAX_PENDING", 2000))
+
+
+class WriteBehind:
+    """
+    Buffer between scraping and the database. Rows are `put` on a bounded
+    queue and handed to the blocking `flush(rows)` in the executor, in
+    batches of `batch_size` rows or `interval` seconds after the oldest
+    buffered one, while scraping goes on.
+    `put` waits while `max_pending` rows are queued, so a database falling
+    behind slows scraping down instead of piling rows up in memory.
+
+        async with WriteBehind(flush) as writer:
+            async for row in rows:
+                await writer.put(row)
+    """
+
+    def __init__(self, flush, batch_size=None, interval=None, max_pending=None, executor=None):
+        self.flush = flush
+        self.batch_size = batch_size or WRITE_BATCH_SIZE
+        self.interval = interval or WRITE_INTERVAL
+        self.executor = executor
+        self.queue = asyncio.Queue(max_pending or WRITE_MAX_PENDING)
+        self.writer = None
+        self.flushes = 0
+
+    async def __aenter__(self):
+        self.writer = asyncio.ensure_future(self._write())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        # rows fetched before a failure are still written, they are a checkpoint
+        if not self.writer.done():
+            await self.queue.put(None)
+        await self.writer
+
+    async def put(self, row):
+        if self.writer.done():
+            # surface a failed flush
+            self.writer.result()
+        await self.queue.put(row)
+
+    async def put_many(self, rows):
+        for row in rows:
+            await self.put(row)
+
+    async def _flush(self, rows):
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.flush, rows)
+        self.flushes += 1
+
+    async def _write(self):
+        buffer, flush_at, done = [], None, False
+
+        try:
+            while not done:
+                timeout = None if flush_at is None else max(flush_at - monotonic(), 0)
+                try:
+                    row = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    row = ...
+
+                if row is None:
+                    done = True
+                elif row is not ...:
+                    buffer.append(row)
+                    flush_at = flush_at or monotonic() + self.interval
+
+                if buffer and (done or len(buffer) >= self.batch_size or monotonic() >= flush_at):
+                    rows, buffer, flush_at = buffer, [], None
+                    await self._flush(rows)
+        except Exception:
+            # unblock producers waiting on a full queue, their next `put` raises
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            raise